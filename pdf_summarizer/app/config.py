@@ -1,4 +1,3 @@
-import torch
 import os
 
 CHUNK_PROFILES = {
@@ -6,13 +5,92 @@ CHUNK_PROFILES = {
     "bart-large-cnn": {"max_tokens": 800, "overlap": 100},
     "mistral": {"max_tokens": 256, "overlap": 32},
     "api":           {"max_tokens": 2000, "overlap": 0},  # API can handle large chunks
+    "instant":       {"max_tokens": 2000, "overlap": 0},  # Extractive only, no model context to respect
 }
 
 SUMMARY_MAX_LENGTH = 300
 SUMMARY_MIN_LENGTH = 100
-DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
+DEVICE = os.getenv("DEVICE")  # "cuda"/"cpu". Unset: detected when a torch backend first loads (see services/backends.py)
+
+# Backends imported at startup instead of on first use, e.g. PRELOAD_BACKENDS=t5-small,api
+PRELOAD_BACKENDS = [b.strip() for b in os.getenv("PRELOAD_BACKENDS", "").split(",") if b.strip()]
+
+def _usable_cpus():
+    """ CPUs this process may actually run on: its affinity mask, capped by a cgroup v2 CPU quota (containers). """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # Not available on macOS/Windows
+        cpus = os.cpu_count() or 4
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            cpus = min(cpus, max(1, int(quota) // int(period)))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+
+# Mistral GGUF runtime (ctransformers). Pick a profile, then override single values via env if needed.
+MISTRAL_MODEL_PATH = os.getenv("MISTRAL_MODEL_PATH", "mistral-7b-v0.1.Q4_K_M.gguf")
+MISTRAL_RUNTIME_PROFILES = {
+    # Offload most layers to an Nvidia GPU
+    "gpu": {"gpu_layers": 50, "context_length": 4096, "batch_size": 8, "threads": -1},
+    # CPU-only nodes: no offload, every usable core, big prompt-eval batches
+    "cpu": {"gpu_layers": 0, "context_length": 4096, "batch_size": 256, "threads": _usable_cpus()},
+}
+# Unset: "gpu" (GPU offload, as before profiles existed) unless DEVICE=cpu, and the loader logs a warning.
+# Decided from config alone; a Mistral-only process never imports torch to ask.
+MISTRAL_PROFILE_SET = bool(os.getenv("MISTRAL_PROFILE"))
+MISTRAL_PROFILE = os.getenv("MISTRAL_PROFILE") or ("cpu" if DEVICE == "cpu" else "gpu")
+MISTRAL_RUNTIME_OVERRIDES = {
+    key: int(os.getenv(f"MISTRAL_{key.upper()}"))
+    for key in ("gpu_layers", "context_length", "batch_size", "threads")
+    if os.getenv(f"MISTRAL_{key.upper()}")
+}
+
+# Extractive pre-filter (see utils/extractive.py)
+EXTRACTIVE_KEEP_RATIO = float(os.getenv("EXTRACTIVE_KEEP_RATIO", "0.3"))     # Fraction of sentences kept
+EXTRACTIVE_TOKEN_BUDGET = int(os.getenv("EXTRACTIVE_TOKEN_BUDGET", "6000"))  # Hard cap on what reaches the map step
+INSTANT_CHUNK_SENTENCES = 3   # "instant" model: sentences kept per chunk (map)
+INSTANT_FINAL_SENTENCES = 10  # "instant" model: sentences in the final summary (reduce)
+
+# Deduplication (see utils/dedup.py)
+FURNITURE_MIN_PAGES = 3       # A line must repeat on at least this many pages...
+FURNITURE_PAGE_RATIO = 0.5    # ...and on this fraction of all pages to count as header/footer
+SIMHASH_MAX_DISTANCE = 3      # Chunks whose fingerprints differ by <= this many bits are duplicates
+
+# Layout-aware extraction (see utils/layout.py)
+HEADING_SIZE_RATIO = 1.15     # A line whose font is this much larger than the body text is a heading
+HEADING_MAX_WORDS = 15        # Longer lines are never headings
+HEADING_MAX_LEVELS = 3        # Deeper headings are folded into the last level
+
+# Deadline-aware generation (see services/deadline.py)
+DEADLINE_REDUCE_CHUNKS = 3    # The reduce step is budgeted as this many map chunks
+DEADLINE_SAFETY = 0.85        # Plan to use only this share of the time left
+
+# Chunk summary cache (see services/summary_cache.py)
+SUMMARY_CACHE_ENABLED = os.getenv("SUMMARY_CACHE_ENABLED", "1") == "1"
+SUMMARY_CACHE_PATH = os.getenv("SUMMARY_CACHE_PATH", "cache/summaries.sqlite3")
+SUMMARY_CACHE_MAX_ENTRIES = int(os.getenv("SUMMARY_CACHE_MAX_ENTRIES", "50000"))  # Least recently used rows go first
 
 UPLOAD_DIR = "uploads"
+MAX_UPLOAD_MB = int(os.getenv("MAX_UPLOAD_MB", "200"))  # Per file; also caps the /upload and /jobs request body
+UPLOAD_READ_SIZE = 1024 * 1024                          # Bytes read from the socket per step
+
+# Background jobs (see services/jobs.py)
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "1"))            # Summaries running at the same time
+JOB_QUEUE_LIMIT = int(os.getenv("JOB_QUEUE_LIMIT", "8"))    # Waiting jobs before we answer 429
+JOB_HISTORY_LIMIT = int(os.getenv("JOB_HISTORY_LIMIT", "100"))  # Finished jobs kept for polling
+
+# Batch endpoint (see services/batch.py)
+BATCH_MAX_FILES = int(os.getenv("BATCH_MAX_FILES", "50"))      # PDFs per request (after unzipping)
+BATCH_MAX_MB = int(os.getenv("BATCH_MAX_MB", "1000"))           # Whole /batch request body
+BATCH_SIZE = int(os.getenv("BATCH_SIZE", "8"))                  # Chunks per generate() call for T5/BART
+BATCH_EXTRACT_WORKERS = int(os.getenv("BATCH_EXTRACT_WORKERS", "4"))  # PDFs extracted + chunked at the same time
+
+# PDF extraction runs in its own processes (PyMuPDF isn't thread-safe), shared by /upload, /jobs and /batch
+EXTRACT_PROCESSES = int(os.getenv("EXTRACT_PROCESSES", "4"))
 
 # API keys
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
@@ -0,0 +1,80 @@
+# ==========================================
+# 1. IMPORTS & SETUP
+# ==========================================
+
+# Third-Party Libraries
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException
+import asyncio
+import json
+import logging
+import zipfile
+
+# Local Logic
+from app.services.batch import summarize_batch
+from app.utils.file_utils import spool_upload, unpack_zip, remove_quietly, SpooledStreamingResponse, UploadTooLargeError
+from app.config import CHUNK_PROFILES, BATCH_MAX_FILES
+
+# Logger setup to print info to console
+logger = logging.getLogger("uvicorn.error")
+
+# ==========================================
+# 2. ROUTER SETUP
+# ==========================================
+router = APIRouter()
+
+# ==========================================
+# 3. THE ENDPOINT
+# ==========================================
+@router.post("/batch")
+async def batch_upload(
+    files: list[UploadFile] = File(...),
+    model_choice: str = Form(...),
+    prefilter: bool = Form(False),
+    structured: bool = Form(False),
+):
+    """
+    Receives several PDFs (and/or zips of PDFs) and streams one JSON object per line
+    (NDJSON) with per-document progress and summaries.
+    """
+    if model_choice not in CHUNK_PROFILES:
+        raise HTTPException(status_code=400, detail=f"Unknown model: {model_choice}")
+
+    # A. SPOOL EVERYTHING TO DISK (zips are unpacked into one file per PDF)
+    documents = []
+    try:
+        for upload in files:
+            path, _ = await spool_upload(upload)
+
+            if (upload.filename or "").lower().endswith(".zip"):
+                try:
+                    # Decompressing can take a while; keep the event loop free meanwhile
+                    documents.extend(await asyncio.to_thread(unpack_zip, path))
+                finally:
+                    remove_quietly(path)
+            else:
+                documents.append((upload.filename or f"document_{len(documents) + 1}.pdf", path))
+
+            if len(documents) > BATCH_MAX_FILES:
+                raise HTTPException(status_code=413, detail=f"At most {BATCH_MAX_FILES} PDFs per batch.")
+    except (UploadTooLargeError, zipfile.BadZipFile) as e:
+        for _, path in documents:
+            remove_quietly(path)
+        status = 413 if isinstance(e, UploadTooLargeError) else 400
+        raise HTTPException(status_code=status, detail=str(e))
+    except HTTPException:
+        for _, path in documents:
+            remove_quietly(path)
+        raise
+
+    if not documents:
+        raise HTTPException(status_code=400, detail="No PDF files found in the upload.")
+
+    # B. DEFINE THE STREAM GENERATOR
+    async def event_stream():
+        async for event in summarize_batch(documents, model_choice, prefilter=prefilter, structured=structured):
+            yield json.dumps(event) + "\n"
+
+    # C. RETURN THE STREAM (the spooled PDFs are deleted however it ends)
+    return SpooledStreamingResponse(
+        event_stream(), [path for _, path in documents], media_type="application/x-ndjson"
+    )
@@ -0,0 +1,79 @@
+# ==========================================
+# 1. IMPORTS & SETUP
+# ==========================================
+
+# Third-Party Libraries
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException
+from fastapi.responses import StreamingResponse
+import logging
+
+# Local Logic
+from app.services.jobs import submit_job, get_job, QueueFullError
+from app.utils.file_utils import spool_upload, UploadTooLargeError
+
+# Logger setup to print info to console
+logger = logging.getLogger("uvicorn.error")
+
+# ==========================================
+# 2. ROUTER SETUP
+# ==========================================
+router = APIRouter()
+
+# ==========================================
+# 3. THE ENDPOINTS
+# ==========================================
+@router.post("/jobs")
+async def create_job(
+    file: UploadFile = File(...),
+    model_choice: str = Form(...),
+    prefilter: bool = Form(False),
+    time_budget: float | None = Form(None),
+    structured: bool = Form(False),
+):
+    """
+    Queues the PDF for summarization and returns immediately with a job ID.
+    The work keeps running even if the client disconnects.
+    """
+    if time_budget is not None and time_budget <= 0:
+        raise HTTPException(status_code=400, detail="time_budget must be a positive number of seconds.")
+
+    try:
+        pdf_path, file_hash = await spool_upload(file)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+    try:
+        job = submit_job(
+            pdf_path, file_hash, model_choice, prefilter=prefilter, time_budget=time_budget, structured=structured
+        )
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+
+    return job.to_dict()
+
+
+@router.get("/jobs/{job_id}")
+async def job_status(job_id: str):
+    """ Polling endpoint: current status, last progress and the result once done. """
+    job = get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job")
+
+    return job.to_dict()
+
+
+@router.get("/jobs/{job_id}/events")
+async def job_events(job_id: str):
+    """
+    Replays the job's stream (same PROGRESS/SUMMARY/ERROR protocol as /upload)
+    from the start, then follows it live until the job finishes.
+    """
+    job = get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job")
+
+    async def event_stream():
+        async for msg in job.follow():
+            yield msg + "\n"
+
+    return StreamingResponse(event_stream(), media_type="text/plain")
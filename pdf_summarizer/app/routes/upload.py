@@ -3,12 +3,12 @@
 # ==========================================
 
 # Third-Party Libraries
-from fastapi import APIRouter, UploadFile, File, Form
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException
 import logging
 
 # Local Logic
 from app.services.summarizer import summarize_text
+from app.utils.file_utils import spool_upload, SpooledStreamingResponse, UploadTooLargeError
 
 # Logger setup to print info to console
 logger = logging.getLogger("uvicorn.error")
@@ -22,21 +22,43 @@ router = APIRouter()
 # 3. THE ENDPOINT
 # ==========================================
 @router.post("/upload")
-async def upload_pdf(file: UploadFile = File(...), model_choice: str = Form(...)):
+async def upload_pdf(
+    file: UploadFile = File(...),
+    model_choice: str = Form(...),
+    prefilter: bool = Form(False),
+    time_budget: float | None = Form(None),
+    stats: bool = Form(False),
+    structured: bool = Form(False),
+    partials: bool = Form(False),
+):
     """
-    Receives the PDF and model selection, reads the file into memory,
+    Receives the PDF and model selection, spools the file to disk,
     and opens a streaming connection back to the client.
+    'time_budget' (seconds, optional) asks the pipeline to finish within that time.
+    'stats' appends a per-stage timing breakdown ("STATS:...") to the stream.
+    'structured' chunks along the document's sections (adds a "SECTIONS:..." message).
+    'partials' streams the final summary while it is generated ("PARTIAL:..." messages).
     """
 
-    # A. READ THE FILE
-    content = await file.read()
+    if time_budget is not None and time_budget <= 0:
+        raise HTTPException(status_code=400, detail="time_budget must be a positive number of seconds.")
+
+    # A. SPOOL THE FILE (never hold the whole PDF in RAM)
+    try:
+        pdf_path, _ = await spool_upload(file)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     
     # B. DEFINE THE STREAM GENERATOR
     async def event_stream():
-        async for msg in summarize_text(content, model_choice):
+        async for msg in summarize_text(
+            pdf_path, model_choice, prefilter=prefilter, time_budget=time_budget, stats=stats,
+            structured=structured, partials=partials
+        ):
             # CRITICAL: Append "\n" because Frontend looks for newlines to split the stream into messages. Without this, the frontend 
             # buffer would just keep filling up and never process anything.
             yield msg + "\n"
 
     # C. RETURN THE STREAM
-    return StreamingResponse(event_stream(), media_type="text/plain")
\ No newline at end of file
+    # The response deletes the spooled file when the stream ends, fails, or the client disconnects
+    return SpooledStreamingResponse(event_stream(), [pdf_path], media_type="text/plain")
\ No newline at end of file
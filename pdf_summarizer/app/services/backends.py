@@ -0,0 +1,123 @@
+# ==========================================
+# 1. IMPORTS & SETUP
+# ==========================================
+# Every model backend is registered here by name, with the heavy libraries it needs.
+# Nothing below is imported when the app starts: a backend's libraries are imported
+# (and timed) the first time a request uses it, so a process serving only "api"
+# never loads torch or transformers.
+
+# Third-Party Libraries
+import sys
+import time
+import logging
+import importlib
+import subprocess
+
+# Local Logic
+from app.services.metrics import observe
+from app.config import DEVICE, PRELOAD_BACKENDS
+
+# Logger setup to print info to console
+logger = logging.getLogger("uvicorn.error")
+
+# Backend name -> modules imported on first use
+BACKENDS = {
+    "t5-small":       ("torch", "transformers"),
+    "bart-large-cnn": ("torch", "transformers"),
+    "mistral":        ("ctransformers",),
+    "api":            ("google.generativeai",),
+    "instant":        (),  # NumPy only, which the core app imports anyway (extractive pre-filter)
+}
+
+_import_seconds = {}   # backend -> seconds its first import took in this process
+_device = None
+
+# ==========================================
+# 2. LAZY IMPORT
+# ==========================================
+
+def ensure_backend(name):
+    """
+    Imports the libraries of backend 'name' once per process and records how long it took.
+    Libraries already pulled in by another backend cost (almost) nothing the second time.
+    """
+    if name in _import_seconds:
+        return
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown model: {name}")
+
+    started = time.perf_counter()
+    for module in BACKENDS[name]:
+        importlib.import_module(module)
+    seconds = time.perf_counter() - started
+
+    _import_seconds[name] = seconds
+    observe("pdfsum_backend_import_seconds", seconds, backend=name)
+    logger.info(f"Imported {name} backend ({', '.join(BACKENDS[name])}) in {seconds:.2f}s")
+
+
+def get_device():
+    """
+    "cuda" or "cpu" for the torch backends. The DEVICE env var wins; otherwise torch is asked,
+    which only happens once a torch backend actually needs it (Mistral's profile comes from config).
+    """
+    global _device
+    if _device is None:
+        _device = DEVICE
+        if not _device:
+            try:
+                import torch
+                _device = "cuda" if torch.cuda.is_available() else "cpu"
+            except ImportError:
+                _device = "cpu"
+    return _device
+
+# ==========================================
+# 3. STARTUP REPORT
+# ==========================================
+
+def startup_report():
+    """
+    Called once when the app starts. Imports the backends listed in PRELOAD_BACKENDS
+    (so the first request doesn't pay for it) and logs the import cost of every backend.
+    """
+    for name in PRELOAD_BACKENDS:
+        try:
+            ensure_backend(name)
+        except (ImportError, ValueError) as e:
+            logger.warning(f"Could not preload backend '{name}': {e}")
+
+    for name, modules in BACKENDS.items():
+        if not modules:
+            logger.info(f"  backend {name:<15} no libraries of its own")
+        elif name in _import_seconds:
+            logger.info(f"  backend {name:<15} imported in {_import_seconds[name]:.2f}s")
+        else:
+            logger.info(f"  backend {name:<15} not imported yet ({', '.join(modules)} load on first use)")
+    logger.info(f"torch loaded: {'torch' in sys.modules}")
+
+
+def measure_cold_imports():
+    """
+    Import cost of each backend from a clean interpreter (one subprocess per backend),
+    i.e. what a fresh worker pays the first time that backend is used.
+    """
+    results = {}
+    for name, modules in BACKENDS.items():
+        code = (
+            "import time, importlib; t = time.perf_counter()\n"
+            f"for m in {modules!r}: importlib.import_module(m)\n"
+            "print(time.perf_counter() - t)"
+        )
+        proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+        if proc.returncode == 0:
+            results[name] = round(float(proc.stdout.strip().splitlines()[-1]), 3)
+        else:
+            results[name] = None  # Library not installed here
+    return results
+
+
+if __name__ == "__main__":
+    # python -m app.services.backends
+    for name, seconds in measure_cold_imports().items():
+        print(f"{name:<15} {'not installed' if seconds is None else f'{seconds:.2f}s'}")
@@ -0,0 +1,232 @@
+# ==========================================
+# 1. IMPORTS & SETUP
+# ==========================================
+
+# Third-Party Libraries
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import aclosing
+
+# Local Logic
+from app.services.model_loader import get_model_and_tokenizer
+from app.services.summarizer import extract_text, extract_sections, run_extraction, prepare_chunks, prepare_section_chunks
+from app.services.metrics import Trace, inc, observe, COUNT_BUCKETS
+from app.utils.text_utils import count_tokens
+from app.config import BATCH_SIZE, BATCH_EXTRACT_WORKERS
+
+from app.services.summarizers import (
+    map_batch_t5, finalize_t5,
+    map_batch_bart, finalize_bart,
+    summarize_mistral, finalize_mistral,
+    summarize_api, finalize_api,
+    summarize_instant, finalize_instant
+)
+
+# Logger setup to print info to console
+logger = logging.getLogger("uvicorn.error")
+
+# Models whose map step can run many chunks through one padded generate() call
+BATCHED_MAPPERS = {
+    "t5-small": map_batch_t5,
+    "bart-large-cnn": map_batch_bart,
+}
+
+# ==========================================
+# 2. HELPERS
+# ==========================================
+def _sequential_mapper(model_choice, model, chunks, trace):
+    """ Per-document map for backends that can't batch (same generators as /upload). """
+    if model_choice == "mistral":
+        return summarize_mistral(model, chunks, trace=trace)
+    if model_choice == "api":
+        return summarize_api(chunks, trace=trace)
+    return summarize_instant(chunks, trace=trace)
+
+
+async def _reduce(model_choice, tokenizer, model, summaries):
+    combined_summaries = "\n\n".join(s for s in summaries if s)
+
+    if model_choice == "t5-small":
+        return await finalize_t5(tokenizer, model, combined_summaries)
+    if model_choice == "bart-large-cnn":
+        return await finalize_bart(tokenizer, model, combined_summaries)
+    if model_choice == "mistral":
+        return await finalize_mistral(model, combined_summaries)
+    if model_choice == "api":
+        return await finalize_api(combined_summaries)
+    return await finalize_instant(combined_summaries)
+
+# ==========================================
+# 3. MAIN PROCESS
+# ==========================================
+async def summarize_batch(documents, model_choice, prefilter=False, structured=False):
+    """
+    Summarizes many PDFs in one go. 'documents' is a list of (name, pdf_path).
+    Yields event dicts (the route writes them as NDJSON):
+      extracted -> progress ... -> summary   per document, error on failure, done at the end.
+
+    - The model is loaded once for the whole batch.
+    - Extraction (in worker processes) + chunking (in threads) runs for BATCH_EXTRACT_WORKERS documents at a time.
+    - With 'structured', chunks follow each document's sections ("extracted" then lists their titles).
+    - For T5/BART all documents' chunks share one queue and go through the model
+      BATCH_SIZE at a time, so a batch can mix chunks from several documents.
+    - Metrics are recorded like in summarize_text, with one trace for the whole batch
+      (each padded generate() call is a "map_batch" span).
+    """
+    trace = Trace(model_choice)
+    try:
+        steps = _run_batch(trace, documents, model_choice, prefilter, structured)
+        async with aclosing(steps):
+            async for event in steps:
+                yield event
+    finally:
+        # Also when a step fails or the client goes away mid-stream
+        trace.finish()
+
+
+async def _run_batch(trace, documents, model_choice, prefilter, structured):
+    """ The steps of summarize_batch; spans and counts go to 'trace'. """
+    started = time.perf_counter()
+    with trace.span("model_load"):
+        tokenizer, model = get_model_and_tokenizer(model_choice)
+    batched_mapper = BATCHED_MAPPERS.get(model_choice)
+
+    # ==========================================
+    # A. PARALLEL EXTRACTION (PDF -> Chunks)
+    # ==========================================
+    gate = asyncio.Semaphore(BATCH_EXTRACT_WORKERS)
+
+    async def prepare(path):
+        """ (chunks, skipped_duplicates, titles, tokens_in) of one document. """
+        async with gate:
+            if structured:
+                with trace.span("extract"):
+                    sections = await run_extraction(extract_sections, path)
+                with trace.span("chunk"):
+                    return await asyncio.to_thread(prepare_section_chunks, sections, model_choice, tokenizer, prefilter)
+
+            with trace.span("extract"):
+                text = await run_extraction(extract_text, path)
+            if not text.strip():
+                return [], 0, None, 0
+            with trace.span("chunk"):
+                chunks, skipped, tokens_in = await asyncio.to_thread(prepare_chunks, text, model_choice, tokenizer, prefilter)
+            return chunks, skipped, None, tokens_in
+
+    tasks = [asyncio.ensure_future(prepare(path)) for _, path in documents]
+    docs = [{"name": name, "chunks": [], "summaries": [], "done": 0} for name, _ in documents]
+
+    # ==========================================
+    # B. SHARED MAP QUEUE (T5/BART)
+    # ==========================================
+    pending = deque()   # (doc_index, chunk_index), in arrival order
+
+    async def finish(doc):
+        """ Reduce step for one document, as an event. """
+        summaries = doc["summaries"]
+        tokens_out = await asyncio.to_thread(lambda: sum(count_tokens(s, tokenizer) for s in summaries if s))
+        inc("pdfsum_chunks_total", len(summaries), model=model_choice)
+        inc("pdfsum_tokens_out_total", tokens_out, model=model_choice)
+
+        try:
+            with trace.span("reduce"):
+                summary = await _reduce(model_choice, tokenizer, model, summaries)
+            return {"type": "summary", "doc": doc["name"], "summary": summary}
+        except Exception as e:
+            logger.error(f"Reduce failed for {doc['name']}: {e}")
+            return {"type": "error", "doc": doc["name"], "message": str(e)}
+
+    async def run_batches(flush):
+        """ Runs full batches (or everything left, if 'flush') and yields the resulting events. """
+        while pending and (flush or len(pending) >= BATCH_SIZE):
+            batch = [pending.popleft() for _ in range(min(BATCH_SIZE, len(pending)))]
+            chunks = [docs[d]["chunks"][i] for d, i in batch]
+
+            try:
+                with trace.span("map_batch"):
+                    results = await asyncio.to_thread(batched_mapper, tokenizer, model, chunks)
+            except Exception as e:
+                logger.error(f"Batched map failed: {e}")
+                failed = sorted({d for d, _ in batch})
+
+                # The failed documents' other chunks would only waste model time
+                remaining = [entry for entry in pending if entry[0] not in failed]
+                pending.clear()
+                pending.extend(remaining)
+
+                for d in failed:
+                    docs[d]["failed"] = True
+                    yield {"type": "error", "doc": docs[d]["name"], "message": str(e)}
+                continue
+
+            touched = []
+            for (d, i), summary in zip(batch, results):
+                docs[d]["summaries"][i] = summary
+                docs[d]["done"] += 1
+                if d not in touched:
+                    touched.append(d)
+
+            for d in touched:
+                doc = docs[d]
+                if doc.get("failed"):
+                    continue
+
+                yield {"type": "progress", "doc": doc["name"], "done": doc["done"], "total": len(doc["chunks"])}
+
+                # A document is reduced as soon as its last chunk is back, not at the end of the batch
+                if doc["done"] == len(doc["chunks"]):
+                    yield await finish(doc)
+
+    # ==========================================
+    # C. COLLECTION (documents in upload order)
+    # ==========================================
+    for d, task in enumerate(tasks):
+        doc = docs[d]
+
+        try:
+            chunks, skipped, titles, tokens_in = await task
+        except Exception as e:
+            logger.error(f"Extraction failed for {doc['name']}: {e}")
+            yield {"type": "error", "doc": doc["name"], "message": f"Could not read PDF: {e}"}
+            continue
+
+        event = {"type": "extracted", "doc": doc["name"], "chunks": len(chunks), "skipped_duplicates": skipped}
+        if titles:
+            event["sections"] = titles
+        yield event
+
+        if not chunks:
+            yield {"type": "summary", "doc": doc["name"],
+                   "summary": "No readable text found. This might be a scanned image PDF."}
+            continue
+
+        doc["chunks"] = chunks
+        doc["summaries"] = [None] * len(chunks)
+
+        inc("pdfsum_documents_total", model=model_choice)
+        observe("pdfsum_chunks_per_document", len(chunks), buckets=COUNT_BUCKETS, model=model_choice)
+        inc("pdfsum_tokens_in_total", tokens_in, model=model_choice)
+
+        if batched_mapper:
+            pending.extend((d, i) for i in range(len(chunks)))
+            async for event in run_batches(flush=False):
+                yield event
+        else:
+            try:
+                async for idx, summary in _sequential_mapper(model_choice, model, chunks, trace):
+                    doc["summaries"][idx - 1] = summary
+                    yield {"type": "progress", "doc": doc["name"], "done": idx, "total": len(chunks)}
+            except Exception as e:
+                # One document's backend error (rate limit, timeout, ...) must not end the whole stream
+                logger.error(f"Map failed for {doc['name']}: {e}")
+                yield {"type": "error", "doc": doc["name"], "message": str(e)}
+                continue
+            yield await finish(doc)
+
+    if batched_mapper:
+        async for event in run_batches(flush=True):
+            yield event
+
+    yield {"type": "done", "documents": len(documents), "seconds": round(time.perf_counter() - started, 2)}
@@ -0,0 +1,121 @@
+# ==========================================
+# 1. IMPORTS & SETUP
+# ==========================================
+
+# Third-Party Libraries
+import time
+import logging
+
+# Local Logic
+from app.config import DEADLINE_REDUCE_CHUNKS, DEADLINE_SAFETY
+
+# Logger setup to print info to console
+logger = logging.getLogger("uvicorn.error")
+
+# ==========================================
+# 2. QUALITY LADDER
+# ==========================================
+# From best to fastest. 'length' scales min/max summary length (or max_new_tokens),
+# 'cost' is the rough time of one chunk relative to the first level.
+LEVELS = [
+    {"name": "full",    "num_beams": 4, "length": 1.0,  "cost": 1.0},
+    {"name": "reduced", "num_beams": 2, "length": 0.75, "cost": 0.55},
+    {"name": "greedy",  "num_beams": 1, "length": 0.5,  "cost": 0.25},
+    {"name": "minimal", "num_beams": 1, "length": 0.3,  "cost": 0.15},
+]
+
+# Backends whose generation parameters the ladder can change (the API and extractive ones have no knobs)
+ADAPTIVE_MODELS = ("t5-small", "bart-large-cnn", "mistral")
+
+# Parameters apply() changes, in the order SETTINGS reports them
+_ADAPTED_PARAMS = ("num_beams", "min_length", "max_length", "max_new_tokens")
+
+# ==========================================
+# 3. THE PLANNER
+# ==========================================
+class DeadlinePlanner:
+    """
+    Keeps a summarization inside a time budget.
+    Measures how long each map chunk takes and, like the dynamic max-tokens math in
+    summarize_mistral, picks the best quality level that still fits the remaining
+    chunks plus the reduce step into the time left.
+    """
+
+    def __init__(self, budget_seconds):
+        self.budget = budget_seconds
+        self.deadline = time.monotonic() + budget_seconds
+        self.total = 0
+        self.done = 0
+        self.level = 0
+        self._full_costs = []     # Measured chunk times, normalized to the "full" level
+        self._level_changed = False
+        self._pending_report = None
+
+    def start(self, total_chunks):
+        self.total = total_chunks
+        self._level_changed = True  # The first apply() reports the starting settings
+
+    def apply(self, params):
+        """
+        Returns a copy of the generation parameters adapted to the current level.
+        The first call after a level change also prepares the SETTINGS report from the result.
+        """
+        lvl = LEVELS[self.level]
+        out = dict(params)
+
+        if "num_beams" in out:
+            out["num_beams"] = min(out["num_beams"], lvl["num_beams"])
+            if out["num_beams"] == 1:
+                out.pop("early_stopping", None)
+        if "min_length" in out:
+            out["min_length"] = int(out["min_length"] * lvl["length"])
+        if "max_length" in out:
+            out["max_length"] = max(out.get("min_length", 0) + 10, int(out["max_length"] * lvl["length"]))
+        if "max_new_tokens" in out:
+            out["max_new_tokens"] = max(32, int(out["max_new_tokens"] * lvl["length"]))
+
+        if self._level_changed:
+            self._level_changed = False
+            self._pending_report = self.describe(out)
+        return out
+
+    def record(self, seconds):
+        """ Called after each generated chunk with its wall time. """
+        self.done += 1
+        self._full_costs.append(seconds / LEVELS[self.level]["cost"])
+        self._adapt()
+
+    def _adapt(self):
+        recent = self._full_costs[-3:]
+        full_cost = sum(recent) / len(recent)
+
+        # The reduce step is budgeted as a few extra chunks
+        remaining = max(0, self.total - self.done) + DEADLINE_REDUCE_CHUNKS
+        time_left = self.deadline - time.monotonic()
+        allowed = DEADLINE_SAFETY * time_left / remaining
+
+        new_level = len(LEVELS) - 1
+        for i, lvl in enumerate(LEVELS):
+            if full_cost * lvl["cost"] <= allowed:
+                new_level = i
+                break
+
+        if new_level != self.level:
+            logger.info(
+                f"Deadline: {time_left:.1f}s left for {remaining} chunk-equivalents, "
+                f"switching to '{LEVELS[new_level]['name']}'"
+            )
+            self.level = new_level
+            self._level_changed = True
+
+    def describe(self, applied):
+        """ The current level and the adapted values of 'applied' (parameters the backend doesn't use are left out). """
+        settings = [f"level={LEVELS[self.level]['name']}"]
+        settings += [f"{key}={applied[key]}" for key in _ADAPTED_PARAMS if key in applied]
+        settings.append(f"budget={self.budget:g}s")
+        return ",".join(settings)
+
+    def pop_report(self):
+        """ The settings line to stream if the level changed since the last call, else None. """
+        report, self._pending_report = self._pending_report, None
+        return report
@@ -0,0 +1,194 @@
+# ==========================================
+# 1. IMPORTS & SETUP
+# ==========================================
+
+# Third-Party Libraries
+import asyncio
+import logging
+import time
+import uuid
+
+# Local Logic
+from app.services.summarizer import summarize_text
+from app.utils.file_utils import remove_quietly
+from app.services.metrics import observe
+from app.config import JOB_WORKERS, JOB_QUEUE_LIMIT, JOB_HISTORY_LIMIT
+
+# Logger setup to print info to console
+logger = logging.getLogger("uvicorn.error")
+
+
+class QueueFullError(Exception):
+    """ Raised when the job queue is at JOB_QUEUE_LIMIT (the route turns it into a 429). """
+
+
+# ==========================================
+# 2. THE JOB OBJECT
+# ==========================================
+class Job:
+    """
+    One summarization request. Keeps every protocol message it produced,
+    so a client can reconnect and replay the stream from the beginning.
+    """
+
+    def __init__(self, key, model_choice, prefilter=False, time_budget=None, structured=False):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.model_choice = model_choice
+        self.prefilter = prefilter
+        self.time_budget = time_budget
+        self.structured = structured
+        self.status = "queued"   # queued -> running -> done | failed
+        self.events = []         # Raw protocol lines ("PROGRESS:1/4", "SUMMARY:...")
+        self.summary = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self._changed = asyncio.Condition()
+
+    @property
+    def finished(self):
+        return self.status in ("done", "failed")
+
+    async def push(self, msg):
+        """ Stores a protocol message and wakes up everyone following /events. """
+        self.events.append(msg)
+
+        if msg.startswith("SUMMARY:"):
+            self.summary = msg[len("SUMMARY:"):].replace("\\n", "\n")
+        elif msg.startswith("ERROR:"):
+            self.error = msg[len("ERROR:"):]
+
+        async with self._changed:
+            self._changed.notify_all()
+
+    async def finish(self):
+        self.status = "failed" if self.error else "done"
+        self.finished_at = time.time()
+
+        async with self._changed:
+            self._changed.notify_all()
+
+    async def follow(self):
+        """ Yields all past events, then new ones as they arrive, until the job ends. """
+        sent = 0
+        while True:
+            while sent < len(self.events):
+                yield self.events[sent]
+                sent += 1
+
+            if self.finished:
+                return
+
+            async with self._changed:
+                # Re-check under the lock so we don't miss a notify between the checks above
+                if sent == len(self.events) and not self.finished:
+                    await self._changed.wait()
+
+    def to_dict(self):
+        progress = next((e[len("PROGRESS:"):] for e in reversed(self.events) if e.startswith("PROGRESS:")), None)
+        return {
+            "id": self.id,
+            "status": self.status,
+            "model_choice": self.model_choice,
+            "prefilter": self.prefilter,
+            "time_budget": self.time_budget,
+            "structured": self.structured,
+            "progress": progress,
+            "summary": self.summary,
+            "error": self.error,
+            "events": len(self.events),
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+
+# ==========================================
+# 3. THE REGISTRY & QUEUE
+# ==========================================
+_jobs = {}        # job_id -> Job
+_inflight = {}    # dedup key -> job_id (only queued/running jobs)
+_queue = None
+_workers = []
+
+
+def _ensure_workers():
+    """ Creates the queue and worker tasks lazily, inside the running event loop. """
+    global _queue
+
+    if _queue is None:
+        _queue = asyncio.Queue(maxsize=JOB_QUEUE_LIMIT)
+
+    if not _workers:
+        for i in range(JOB_WORKERS):
+            _workers.append(asyncio.create_task(_worker(i)))
+
+
+def _forget_old_jobs():
+    """ Keeps the registry bounded: drops the oldest finished jobs past JOB_HISTORY_LIMIT. """
+    finished = [j for j in _jobs.values() if j.finished]
+    if len(finished) <= JOB_HISTORY_LIMIT:
+        return
+
+    finished.sort(key=lambda j: j.finished_at)
+    for job in finished[:len(finished) - JOB_HISTORY_LIMIT]:
+        del _jobs[job.id]
+
+
+async def _worker(worker_id):
+    while True:
+        job, pdf_path = await _queue.get()
+        job.status = "running"
+        observe("pdfsum_queue_wait_seconds", time.time() - job.created_at)
+        logger.info(f"Worker {worker_id} picked up job {job.id} ({job.model_choice})")
+
+        try:
+            async for msg in summarize_text(
+                pdf_path, job.model_choice, prefilter=job.prefilter, time_budget=job.time_budget, structured=job.structured
+            ):
+                await job.push(msg)
+        except Exception as e:
+            logger.error(f"Job {job.id} failed: {e}")
+            await job.push(f"ERROR:{e}")
+        finally:
+            _inflight.pop(job.key, None)
+            remove_quietly(pdf_path)
+            await job.finish()
+            _forget_old_jobs()
+            _queue.task_done()
+
+
+# ==========================================
+# 4. PUBLIC API
+# ==========================================
+def submit_job(pdf_path, file_hash, model_choice, prefilter=False, time_budget=None, structured=False):
+    """
+    Queues a summarization of the spooled PDF and returns its Job.
+    Identical in-flight uploads (same file hash + same settings) share a single job.
+    Takes ownership of 'pdf_path': it is deleted once no longer needed.
+    """
+    _ensure_workers()
+
+    key = f"{file_hash}:{model_choice}:{int(prefilter)}:{time_budget}:{int(structured)}"
+
+    # A. DEDUPLICATION
+    if key in _inflight:
+        logger.info(f"Reusing in-flight job {_inflight[key]} for identical upload")
+        remove_quietly(pdf_path)
+        return _jobs[_inflight[key]]
+
+    # B. ADMISSION CONTROL
+    if _queue.full():
+        remove_quietly(pdf_path)
+        raise QueueFullError(f"Job queue is full ({JOB_QUEUE_LIMIT} waiting). Try again later.")
+
+    job = Job(key, model_choice, prefilter, time_budget, structured)
+    _jobs[job.id] = job
+    _inflight[key] = job.id
+    _queue.put_nowait((job, pdf_path))
+
+    return job
+
+
+def get_job(job_id):
+    return _jobs.get(job_id)
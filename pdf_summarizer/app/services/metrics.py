@@ -0,0 +1,141 @@
+# ==========================================
+# 1. IMPORTS & SETUP
+# ==========================================
+
+# Third-Party Libraries
+import time
+import logging
+import threading
+from contextlib import contextmanager
+
+# Logger setup to print info to console
+logger = logging.getLogger("uvicorn.error")
+
+# Histogram bucket upper bounds
+SECONDS_BUCKETS = (0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+# One line of help per metric, shown on /metrics
+HELP = {
+    "pdfsum_stage_seconds": ("histogram", "Wall time per pipeline stage (extract, chunk, model_load, map_chunk, map_batch, reduce, total)."),
+    "pdfsum_model_load_seconds": ("histogram", "Time to load a model from disk (cache misses only)."),
+    "pdfsum_backend_import_seconds": ("histogram", "Time to import a backend's libraries on first use (torch, transformers, ...)."),
+    "pdfsum_queue_wait_seconds": ("histogram", "Time a background job waited in the queue before a worker picked it up."),
+    "pdfsum_chunks_per_document": ("histogram", "Chunks sent to the map step per document."),
+    "pdfsum_documents_total": ("counter", "Documents summarized."),
+    "pdfsum_chunks_total": ("counter", "Chunks summarized in the map step."),
+    "pdfsum_tokens_in_total": ("counter", "Tokens sent to the model (map step, estimated for backends without a tokenizer)."),
+    "pdfsum_tokens_out_total": ("counter", "Tokens produced by the map step."),
+}
+
+# ==========================================
+# 2. THE REGISTRY (process-wide, in memory)
+# ==========================================
+_lock = threading.Lock()
+_counters = {}     # (name, labels) -> value
+_histograms = {}   # (name, labels) -> {"bounds", "counts", "sum", "count"}
+
+
+def _labels(labels):
+    return tuple(sorted(labels.items()))
+
+
+def inc(name, value=1, **labels):
+    """ Adds 'value' to a counter. """
+    key = (name, _labels(labels))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def observe(name, value, buckets=SECONDS_BUCKETS, **labels):
+    """ Records one sample in a histogram. """
+    key = (name, _labels(labels))
+    with _lock:
+        hist = _histograms.get(key)
+        if hist is None:
+            hist = _histograms[key] = {"bounds": buckets, "counts": [0] * len(buckets), "sum": 0.0, "count": 0}
+
+        for i, bound in enumerate(hist["bounds"]):
+            if value <= bound:
+                hist["counts"][i] += 1
+        hist["sum"] += value
+        hist["count"] += 1
+
+# ==========================================
+# 3. PER-REQUEST TRACE
+# ==========================================
+class Trace:
+    """
+    Timing breakdown of one summarization. Every recorded span also feeds the
+    global 'pdfsum_stage_seconds' histogram, labelled with the stage and model.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.started = time.perf_counter()
+        self.stages = {}   # stage -> [total_seconds, count]
+        self.counts = {}   # free-form numbers for the STATS line (chunks, tokens, ...)
+
+    @contextmanager
+    def span(self, stage):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - started)
+
+    def record(self, stage, seconds):
+        observe("pdfsum_stage_seconds", seconds, stage=stage, model=self.model)
+        total = self.stages.setdefault(stage, [0.0, 0])
+        total[0] += seconds
+        total[1] += 1
+
+    def finish(self):
+        self.record("total", time.perf_counter() - self.started)
+
+    def summary(self):
+        """ Per-stage seconds (and call counts for repeated stages) plus the counters. """
+        out = {"model": self.model}
+        for stage, (seconds, count) in self.stages.items():
+            out[f"{stage}_s"] = round(seconds, 3)
+            if count > 1:
+                out[f"{stage}_count"] = count
+        out.update(self.counts)
+        return out
+
+# ==========================================
+# 4. EXPOSITION (Prometheus text format)
+# ==========================================
+def _fmt_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+
+def render():
+    """ Renders every metric in the Prometheus text exposition format. """
+    with _lock:
+        counters = dict(_counters)
+        histograms = {k: {**v, "counts": list(v["counts"])} for k, v in _histograms.items()}
+
+    lines = []
+    for name in sorted({k[0] for k in counters} | {k[0] for k in histograms}):
+        kind, help_text = HELP.get(name, ("untyped", ""))
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+
+        for (n, labels), value in sorted(counters.items()):
+            if n == name:
+                lines.append(f"{name}{_fmt_labels(labels)} {value}")
+
+        for (n, labels), hist in sorted(histograms.items()):
+            if n != name:
+                continue
+            for bound, count in zip(hist["bounds"], hist["counts"]):
+                lines.append(f"{name}_bucket{_fmt_labels(labels, [('le', bound)])} {count}")
+            lines.append(f"{name}_bucket{_fmt_labels(labels, [('le', '+Inf')])} {hist['count']}")
+            lines.append(f"{name}_sum{_fmt_labels(labels)} {round(hist['sum'], 6)}")
+            lines.append(f"{name}_count{_fmt_labels(labels)} {hist['count']}")
+
+    return "\n".join(lines) + "\n"
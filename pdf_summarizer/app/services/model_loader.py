@@ -3,11 +3,14 @@
 # ==========================================
 
 # Third-Party Libraries
-from transformers import (
-    T5Tokenizer, T5ForConditionalGeneration,
-    BartTokenizer, BartForConditionalGeneration,
-)
+# (transformers, torch, ctransformers... are imported per backend on first use, see backends.py)
 import logging
+import time
+
+# Local Logic
+from app.services.metrics import observe
+from app.services.backends import ensure_backend
+from app.config import MISTRAL_MODEL_PATH, MISTRAL_PROFILE, MISTRAL_PROFILE_SET, MISTRAL_RUNTIME_PROFILES, MISTRAL_RUNTIME_OVERRIDES
 
 # Logger setup to print info to console
 logger = logging.getLogger("uvicorn.error")
@@ -17,6 +20,12 @@ logger = logging.getLogger("uvicorn.error")
 # ==========================================
 _loaded = {}
 
+
+def mistral_runtime():
+    """ (profile name, ctransformers settings): the MISTRAL_PROFILE preset plus MISTRAL_<KEY> overrides. """
+    return MISTRAL_PROFILE, {**MISTRAL_RUNTIME_PROFILES[MISTRAL_PROFILE], **MISTRAL_RUNTIME_OVERRIDES}
+
+
 def get_model_and_tokenizer(name: str):
     """
     Factory function to load LLMs.
@@ -27,10 +36,21 @@ def get_model_and_tokenizer(name: str):
     if name in _loaded:
         return _loaded[name]
 
+    # B. IMPORT THE BACKEND'S LIBRARIES (first use only)
+    try:
+        ensure_backend(name)
+    except ImportError as e:
+        if name == "mistral":
+            raise ImportError("ctransformers is required for GGUF Mistral. Install via `pip install ctransformers`") from e
+        raise
+
+    started = time.perf_counter()
+
     # ==========================================
     # MODEL A: T5 (Small & Fast)
     # ==========================================
     if name == "t5-small":
+        from transformers import T5Tokenizer, T5ForConditionalGeneration
         tok = T5Tokenizer.from_pretrained("t5-small")
         mdl = T5ForConditionalGeneration.from_pretrained("t5-small")
 
@@ -39,6 +59,7 @@ def get_model_and_tokenizer(name: str):
     # ==========================================
     elif name == "bart-large-cnn":
         # Uses the 'facebook/bart-large-cnn' weights specifically tuned for summarization
+        from transformers import BartTokenizer, BartForConditionalGeneration
         tok = BartTokenizer.from_pretrained("facebook/bart-large-cnn")
         mdl = BartForConditionalGeneration.from_pretrained("facebook/bart-large-cnn")
 
@@ -46,21 +67,22 @@ def get_model_and_tokenizer(name: str):
     # MODEL C: MISTRAL (Local Quantized LLM)
     # ==========================================
     elif name == "mistral":
-        # Validation: Need a special library 'ctransformers' to run GGUF files.
-        try:
-            from ctransformers import AutoModelForCausalLM
-        except ImportError:
-            raise ImportError("ctransformers is required for GGUF Mistral. Install via `pip install ctransformers`")
+        # Need a special library 'ctransformers' to run GGUF files (validated by ensure_backend above)
+        from ctransformers import AutoModelForCausalLM
 
         # CRITICAL WARNING: This expects a file named "mistral-7b...gguf" in the working directory or in the docker image
-        model_path = "mistral-7b-v0.1.Q4_K_M.gguf"
+        # (override with MISTRAL_MODEL_PATH)
 
         # Loading the GGUF model (Quantized for efficiency)
+        # Threads, batch size, context length and GPU offload come from the runtime profile in config.py
+        profile, runtime = mistral_runtime()
+        if not MISTRAL_PROFILE_SET:
+            logger.warning(f"MISTRAL_PROFILE is not set, using '{profile}'. Set MISTRAL_PROFILE=gpu or cpu to choose.")
+        logger.info(f"Loading Mistral with '{profile}' profile: {runtime}")
         mdl = AutoModelForCausalLM.from_pretrained(
-            model_path,
+            MISTRAL_MODEL_PATH,
             model_type="mistral",
-            gpu_layers=50,      # Offloads layers to Nvidia GPU. Set to 0 if CPU only.
-            context_length=4096
+            **runtime
         )
 
         # ctransformers handles tokenization internally within the model object
@@ -73,11 +95,22 @@ def get_model_and_tokenizer(name: str):
         # No local model or tokenizer to load. The Logic layer handles the API call.
         tok, mdl = None, None
 
+    # ==========================================
+    # MODEL E: INSTANT (Pure Extractive)
+    # ==========================================
+    elif name == "instant":
+        # Sentence scoring with NumPy, nothing to load.
+        tok, mdl = None, None
+
     else:
         raise ValueError(f"Unknown model: {name}")
 
     # UPDATE CACHE
     _loaded[name] = (tok, mdl)
+
+    seconds = time.perf_counter() - started
+    observe("pdfsum_model_load_seconds", seconds, model=name)
+    logger.info(f"Loaded {name} in {seconds:.1f}s")
     
     return tok, mdl
 
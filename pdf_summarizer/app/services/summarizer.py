@@ -6,39 +6,239 @@
 import fitz  # PyMuPDF: The fastest library for reading PDFs
 import asyncio
 import logging
+import json
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import aclosing
 
 # Local Logic
-from app.utils.text_utils import chunk_text
+from app.utils.text_utils import chunk_text, chunk_sections, section_prefix, count_tokens
+from app.utils.layout import extract_sections as layout_sections
 from app.services.model_loader import get_model_and_tokenizer
-from app.config import CHUNK_PROFILES
+from app.utils.extractive import prefilter_chunks, split_sentences
+from app.utils.dedup import strip_page_furniture, drop_near_duplicates
+from app.services.summary_cache import cache_stats, track_request
+from app.services.deadline import DeadlinePlanner, ADAPTIVE_MODELS
+from app.services.metrics import Trace, inc, observe, COUNT_BUCKETS
+from app.config import CHUNK_PROFILES, EXTRACTIVE_KEEP_RATIO, EXTRACTIVE_TOKEN_BUDGET, EXTRACT_PROCESSES, SUMMARY_CACHE_ENABLED
 
 from app.services.summarizers import (
     summarize_t5, finalize_t5,
     summarize_bart, finalize_bart,
     summarize_mistral, finalize_mistral,
-    summarize_api, finalize_api
+    summarize_api, finalize_api,
+    summarize_instant, finalize_instant
 )
 
 # Logger setup
 logger = logging.getLogger("uvicorn.error")
 
+# Worker processes for PyMuPDF (see run_extraction), started on first use
+_extract_pool = None
+
+
+# ==========================================
+# 2. HELPERS (Shared with the batch endpoint)
+# ==========================================
+def open_pdf(pdf_source):
+    """ 'pdf_source' is a path (normal case) or raw bytes. """
+    # Use 'fitz' (PyMuPDF) because it is much faster than PyPDF2. Opening by path lets MuPDF page the file in
+    # from disk on demand instead of us keeping a full copy of it in RAM.
+    if isinstance(pdf_source, (bytes, bytearray)):
+        return fitz.open(stream=pdf_source, filetype="pdf")
+    return fitz.open(pdf_source, filetype="pdf")
+
+
+def page_text(page):
+    """ A page's text with a blank line between PyMuPDF blocks, so chunk_text sees the paragraphs. """
+    blocks = [b[4].strip() for b in page.get_text("blocks") if b[6] == 0 and b[4].strip()]
+    return "\n\n".join(blocks) + "\n"
+
+
+def extract_text(pdf_source):
+    """ PDF -> plain text (paragraphs separated by blank lines), with headers/footers repeated across pages removed. """
+    with open_pdf(pdf_source) as doc:
+        pages = [page_text(p) for p in doc]
+
+    # Headers, footers and page numbers repeat on every page; summarizing them once per chunk is wasted work
+    pages, _ = strip_page_furniture(pages)
+    return "".join(pages)
+
+
+def prepare_chunks(text, model_choice, tokenizer, prefilter=False):
+    """
+    Text -> chunks sized for 'model_choice', minus near-duplicates,
+    optionally shrunk by the extractive pre-filter.
+    Returns (chunks, skipped_duplicates, tokens_in), 'tokens_in' summed from the chunker's own counts.
+    """
+    profile = CHUNK_PROFILES.get(model_choice)
+
+    chunks, counts = chunk_text(
+        text,
+        tokenizer=tokenizer,
+        max_tokens=profile["max_tokens"],
+        overlap_tokens=profile["overlap"],
+        with_counts=True,
+        # Early, content-defined cuts only pay off through cache hits on the next revision
+        content_defined=SUMMARY_CACHE_ENABLED
+    )
+    count_of = dict(zip(chunks, counts))
+
+    # Identical boilerplate sections (repeated disclaimers, copied appendices) only need summarizing once
+    chunks, skipped = drop_near_duplicates(chunks)
+
+    # Optional extractive stage: score all sentences, keep the best ones, re-pack them into (fewer) chunks
+    if prefilter and model_choice != "instant":
+        kept = prefilter_chunks(chunks, EXTRACTIVE_KEEP_RATIO, EXTRACTIVE_TOKEN_BUDGET, tokenizer)
+        if kept:
+            before = len(chunks)
+            chunks, counts = chunk_text(
+                "\n\n".join(kept),
+                tokenizer=tokenizer,
+                max_tokens=profile["max_tokens"],
+                overlap_tokens=profile["overlap"],
+                with_counts=True,
+                content_defined=SUMMARY_CACHE_ENABLED
+            )
+            count_of = dict(zip(chunks, counts))
+            logger.info(f"Pre-filter reduced {before} chunks to {len(chunks)}")
+
+    return chunks, skipped, sum(count_of[c] for c in chunks)
+
+
+def extract_sections(pdf_source):
+    """ PDF -> [(title, text), ...] rebuilt from font sizes (see utils/layout.py). """
+    with open_pdf(pdf_source) as doc:
+        return layout_sections(doc)
+
+
+async def run_extraction(extract, pdf_source):
+    """
+    Runs 'extract' (extract_text or extract_sections) in a worker process.
+    PyMuPDF isn't thread-safe, so concurrent uploads and batch documents can't share it from threads;
+    separate processes still extract EXTRACT_PROCESSES PDFs in parallel.
+    """
+    global _extract_pool
+    if _extract_pool is None:
+        # 'spawn': forking a process that already runs threads (event loop helpers, torch) can deadlock the child
+        _extract_pool = ProcessPoolExecutor(EXTRACT_PROCESSES, mp_context=multiprocessing.get_context("spawn"))
+    return await asyncio.get_running_loop().run_in_executor(_extract_pool, extract, pdf_source)
+
+
+def shutdown_extraction():
+    """ Stops the extraction processes (app shutdown). """
+    global _extract_pool
+    if _extract_pool is not None:
+        _extract_pool.shutdown(cancel_futures=True)
+        _extract_pool = None
+
+
+def prepare_section_chunks(sections, model_choice, tokenizer, prefilter=False):
+    """
+    Structured counterpart of prepare_chunks: chunks follow the sections, with no overlap.
+    Returns (chunks, skipped_duplicates, titles, tokens_in) where titles[i] lists the sections in chunk i.
+    Documents without headings fall back to prepare_chunks (titles is then None).
+    """
+    if not any(title for title, _ in sections):
+        chunks, skipped, tokens_in = prepare_chunks(
+            "\n\n".join(text for _, text in sections), model_choice, tokenizer, prefilter
+        )
+        return chunks, skipped, None, tokens_in
+
+    max_tokens = CHUNK_PROFILES[model_choice]["max_tokens"]
+    chunks, titles, counts = chunk_sections(sections, tokenizer, max_tokens, with_counts=True)
+    count_of = dict(zip(chunks, counts))
+
+    # Near-duplicates: keep the titles of the chunks that survive (the first occurrence of each)
+    title_of = {}
+    for chunk, chunk_titles in zip(chunks, titles):
+        title_of.setdefault(chunk, chunk_titles)
+    chunks, skipped = drop_near_duplicates(chunks)
+    titles = [title_of[c] for c in chunks]
+
+    # Pre-filter: rank sentences across the whole document, then re-pack the survivors per section
+    if prefilter and model_choice != "instant":
+        # Rank the text only: the title prefixes would stick to the first sentence of each section
+        bare = []
+        for chunk, chunk_titles in zip(chunks, titles):
+            for title in chunk_titles:
+                chunk = chunk.replace(section_prefix(title) + " ", "")
+            bare.append(chunk)
+
+        kept = prefilter_chunks(bare, EXTRACTIVE_KEEP_RATIO, EXTRACTIVE_TOKEN_BUDGET, tokenizer)
+        if kept:
+            section_of = {}
+            for title, text in sections:
+                for sentence in split_sentences(text):
+                    section_of.setdefault(sentence, title)
+
+            filtered = []
+            for sentence in kept:
+                # A sentence cut at a chunk boundary won't be found: it stays with the previous section
+                title = section_of.get(sentence, filtered[-1][0] if filtered else "")
+                if filtered and filtered[-1][0] == title:
+                    filtered[-1][1].append(sentence)
+                else:
+                    filtered.append((title, [sentence]))
+
+            before = len(chunks)
+            chunks, titles, counts = chunk_sections(
+                [(t, "\n\n".join(s)) for t, s in filtered], tokenizer, max_tokens, with_counts=True
+            )
+            count_of = dict(zip(chunks, counts))
+            logger.info(f"Pre-filter reduced {before} chunks to {len(chunks)}")
+
+    return chunks, skipped, titles, sum(count_of[c] for c in chunks)
+
 
 # ==========================================
-# 2. MAIN PROCESS
+# 3. MAIN PROCESS
 # ==========================================
-async def summarize_text(file_bytes, model_choice):
+async def summarize_text(pdf_source, model_choice, prefilter=False, time_budget=None, stats=False, structured=False, partials=False):
     """
     The Main Workflow:
     PDF -> Raw Text -> Chunks -> Partial Summaries -> Final Summary
+
+    'pdf_source' is a path to the spooled upload (normal case) or raw bytes.
+    'prefilter' keeps only the most informative sentences before the map step.
+    'time_budget' (seconds) lets generation settings degrade to finish on time.
+    'stats' appends a per-stage timing breakdown as a final "STATS:{json}" message.
+    'structured' chunks along the document's sections (headings found from font sizes) instead of blank lines.
+    'partials' streams the final summary as "PARTIAL:" messages while it is generated
+    (T5/BART then reduce with greedy search instead of beam search).
     """
+    trace = Trace(model_choice)
+    try:
+        pipeline = _run_pipeline(trace, pdf_source, model_choice, prefilter, time_budget, structured, partials)
+        async with aclosing(pipeline):
+            async for msg in pipeline:
+                yield msg
+    finally:
+        # Also when the pipeline returns early, fails, or the client goes away mid-stream
+        trace.finish()
+
+    if stats:
+        # PROTOCOL: Per-request timing breakdown, e.g. STATS:{"extract_s": 0.12, "map_chunk_s": 31.4, ...}
+        yield "STATS:" + json.dumps(trace.summary())
+
+
+async def _run_pipeline(trace, pdf_source, model_choice, prefilter, time_budget, structured, partials):
+    """ The steps of summarize_text; spans and counts go to 'trace'. """
+    # The clock starts now, so extraction and model loading count against the budget.
+    # Backends without generation settings to trade (api, instant) just run as usual.
+    planner = DeadlinePlanner(time_budget) if time_budget and model_choice in ADAPTIVE_MODELS else None
     
     # ==========================================
     # A. EXTRACTION (PDF -> Text)
     # ==========================================
-    # Use 'fitz' (PyMuPDF) because it is much faster than PyPDF2, 'stream=file_bytes' tells it to read from RAM, not look for a file on disk.
-    doc = fitz.open(stream=file_bytes, filetype="pdf")
-    
-    text = "".join([p.get_text() for p in doc])
+    sections = None
+    with trace.span("extract"):
+        if structured:
+            sections = await run_extraction(extract_sections, pdf_source)
+            text = "\n\n".join(t for _, t in sections)
+        else:
+            text = await run_extraction(extract_text, pdf_source)
 
     if not text.strip():
         # Edge Case: Scanned PDFs (images) have no text layer.
@@ -48,34 +248,51 @@ async def summarize_text(file_bytes, model_choice):
     # ==========================================
     # B. PREPARATION (Text -> Chunks)
     # ==========================================
-    profile = CHUNK_PROFILES.get(model_choice)
+    with trace.span("model_load"):
+        tokenizer, model = get_model_and_tokenizer(model_choice)
 
-    tokenizer, model = get_model_and_tokenizer(model_choice)
-
-    chunks = chunk_text(
-        text,
-        tokenizer=tokenizer,
-        max_tokens=profile["max_tokens"],
-        overlap_tokens=profile["overlap"]
-    )
+    titles = None
+    with trace.span("chunk"):
+        if sections:
+            chunks, skipped, titles, tokens_in = await asyncio.to_thread(
+                prepare_section_chunks, sections, model_choice, tokenizer, prefilter
+            )
+        else:
+            chunks, skipped, tokens_in = await asyncio.to_thread(prepare_chunks, text, model_choice, tokenizer, prefilter)
+    if skipped:
+        # PROTOCOL: Tell the Frontend how much work was saved
+        yield f"DEDUP:{skipped}/{skipped + len(chunks)}"
+    if titles:
+        # PROTOCOL: Which sections each chunk covers, in chunk order
+        yield "SECTIONS:" + json.dumps(titles)
 
     for idx, chunk in enumerate(chunks):
-        logger.info(f"Chunk {idx+1} for {model_choice} (Length: {len(chunk)} chars)")
+        section = f", Sections: {' | '.join(titles[idx])}" if titles else ""
+        logger.info(f"Chunk {idx+1} for {model_choice} (Length: {len(chunk)} chars{section})")
 
     total = len(chunks)
 
+    inc("pdfsum_documents_total", model=model_choice)
+    observe("pdfsum_chunks_per_document", total, buckets=COUNT_BUCKETS, model=model_choice)
+
+    if planner:
+        planner.start(total)
+
     # ==========================================
     # C. SELECTION 
     # ==========================================
 
+    # Every model call is recorded as a "map_chunk" span by the summarizer itself
     if model_choice == "t5-small":
-        summarizer = summarize_t5(tokenizer, model, chunks)
+        summarizer = summarize_t5(tokenizer, model, chunks, planner=planner, trace=trace)
     elif model_choice == "bart-large-cnn":
-        summarizer = summarize_bart(tokenizer, model, chunks)
+        summarizer = summarize_bart(tokenizer, model, chunks, planner=planner, trace=trace)
     elif model_choice == "mistral":
-        summarizer = summarize_mistral(model, chunks)
+        summarizer = summarize_mistral(model, chunks, planner=planner, trace=trace)
     elif model_choice == "api":
-        summarizer = summarize_api(chunks)
+        summarizer = summarize_api(chunks, trace=trace)
+    elif model_choice == "instant":
+        summarizer = summarize_instant(chunks, trace=trace)
     else:
         yield "SUMMARY:Invalid model choice."
         return
@@ -84,32 +301,99 @@ async def summarize_text(file_bytes, model_choice):
     # D. COLLECTION
     # ==========================================
     summaries = []
+    cache_counts = track_request()  # This request's own hits/misses, not the process-wide totals
     
     async for idx, summary in summarizer:
         summaries.append(summary)
+
+        # PROTOCOL: Report the generation settings the backend applied, at the start and whenever the planner changes them
+        report = planner.pop_report() if planner else None
+        if report:
+            yield f"SETTINGS:{report}"
         
         # PROTOCOL: Send progress update to Frontend
         # Frontend sees: "PROGRESS:1/max" -> Updates bar 
         yield f"PROGRESS:{idx}/{total}"
 
+    # PROTOCOL: How many chunks came straight from the cache (only new chunks went to the model)
+    hits = cache_counts["hits"]
+    lookups = hits + cache_counts["misses"]
+    if lookups:
+        logger.info(f"Chunk cache: {hits}/{lookups} hits (lifetime hit rate {cache_stats()['hit_rate']:.0%})")
+        yield f"CACHE:{hits}/{lookups}"
+
+    # tokens_in comes from the chunker's counts; the summaries are counted in a thread (the tokenizer is slow)
+    tokens_out = await asyncio.to_thread(lambda: sum(count_tokens(s, tokenizer) for s in summaries))
+    inc("pdfsum_chunks_total", len(summaries), model=model_choice)
+    inc("pdfsum_tokens_in_total", tokens_in, model=model_choice)
+    inc("pdfsum_tokens_out_total", tokens_out, model=model_choice)
+    trace.counts.update(chunks=total, skipped_duplicates=skipped, tokens_in=tokens_in, tokens_out=tokens_out)
+    if titles:
+        trace.counts["sections"] = len({t for chunk_titles in titles for t in chunk_titles})
+
     # ==========================================
     # E. FINALIZATION 
     # ==========================================
     combined_summaries = "\n\n".join(summaries)
     
     final_summary = ""
+
+    # The reduce step runs in a worker thread; each generated piece is handed to the event loop through this queue
+    # (nobody asked for pieces -> no callback, so T5/BART keep beam search)
+    loop = asyncio.get_running_loop()
+    pieces = asyncio.Queue()
+
+    def relay_piece(piece):
+        loop.call_soon_threadsafe(pieces.put_nowait, piece)
+
+    on_partial = relay_piece if partials else None
+
+    reduce_started = time.perf_counter()
     
     try:
         if model_choice == "t5-small":
-            final_summary = await finalize_t5(tokenizer, model, combined_summaries)
+            finalizer = finalize_t5(tokenizer, model, combined_summaries, on_partial=on_partial, planner=planner)
         elif model_choice == "bart-large-cnn":
-            final_summary = await finalize_bart(tokenizer, model, combined_summaries)
+            finalizer = finalize_bart(tokenizer, model, combined_summaries, on_partial=on_partial, planner=planner)
         elif model_choice == "mistral":
-            final_summary = await finalize_mistral(model, combined_summaries)
+            finalizer = finalize_mistral(model, combined_summaries, on_partial=on_partial, planner=planner)
         elif model_choice == "api":
-            final_summary = await finalize_api(combined_summaries)
+            finalizer = finalize_api(combined_summaries, on_partial=on_partial)
+        elif model_choice == "instant":
+            finalizer = finalize_instant(combined_summaries)
         else:
+            finalizer = None
+
+        if finalizer is None:
             final_summary = " ".join(summaries) 
+        else:
+            task = asyncio.ensure_future(finalizer)
+            getter = None
+
+            try:
+                # PROTOCOL: Relay tokens as "PARTIAL:..." while the final summary is being generated
+                while True:
+                    getter = asyncio.ensure_future(pieces.get())
+                    done, _ = await asyncio.wait({getter, task}, return_when=asyncio.FIRST_COMPLETED)
+
+                    if getter in done:
+                        yield "PARTIAL:" + getter.result().replace("\n", "\\n")
+                        continue
+                    break
+
+                # Pieces that arrived together with the end of generation
+                while not pieces.empty():
+                    yield "PARTIAL:" + pieces.get_nowait().replace("\n", "\\n")
+
+                final_summary = task.result()
+            finally:
+                # Client gone mid-reduce (or an error): leave nothing pending on the loop.
+                # A generate() already running in its worker thread still finishes, its result is dropped.
+                if getter:
+                    getter.cancel()
+                task.cancel()
+
+        trace.record("reduce", time.perf_counter() - reduce_started)
 
         # ==========================================
         # F. TRANSPORT FORMATTING
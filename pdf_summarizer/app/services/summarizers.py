@@ -5,145 +5,276 @@
 # Third-Party Libraries
 import asyncio
 import logging
-import google.generativeai as genai
+import time
+# (transformers and google.generativeai are imported inside the strategies that use them, see backends.py)
 from app.config import (
-    DEVICE, SUMMARY_MAX_LENGTH, SUMMARY_MIN_LENGTH, GOOGLE_NLP_API_KEY
+    SUMMARY_MAX_LENGTH, SUMMARY_MIN_LENGTH, GOOGLE_NLP_API_KEY,
+    INSTANT_CHUNK_SENTENCES, INSTANT_FINAL_SENTENCES
 )
+from app.utils.extractive import extractive_summary
+from app.services.summary_cache import get_summary, put_summary
+from app.services.backends import get_device
 
 # Logger setup to print info to console
 logger = logging.getLogger("uvicorn.error")
 
+
+def callback_streamer(tokenizer, on_partial):
+    """
+    A transformers TextStreamer that hands each decoded piece of the reduce output to 'on_partial'
+    instead of printing it. 'skip_prompt' drops the decoder start token that generate() feeds in first.
+    """
+    from transformers import TextStreamer
+
+    class CallbackStreamer(TextStreamer):
+        def on_finalized_text(self, text, stream_end=False):
+            if text:
+                on_partial(text)
+
+    return CallbackStreamer(tokenizer, skip_prompt=True, skip_special_tokens=True)
+
+
+# Beam-search settings shared by the map, reduce and batched-map paths
+T5_PARAMS = dict(
+    max_length=SUMMARY_MAX_LENGTH,
+    min_length=SUMMARY_MIN_LENGTH,
+    num_beams=4,        # Looks at 4 possible futures at once (better quality)
+    early_stopping=True
+)
+
+BART_PARAMS = dict(
+    max_length=SUMMARY_MAX_LENGTH,
+    min_length=SUMMARY_MIN_LENGTH,
+    num_beams=4,
+    length_penalty=2.0, # Encourages slightly longer, more detailed outputs
+    early_stopping=True
+)
+
+
+def map_batch(tokenizer, model, texts, chunks, cache_name, gen_params, max_input):
+    """
+    MAP STEP (batched): one padded generate() call for several chunks, possibly from different documents.
+    'texts' are the model inputs, 'chunks' the raw chunks used as cache keys. Blocking: run it in a thread.
+    """
+    summaries = [get_summary(c, cache_name, gen_params) for c in chunks]
+    todo = [i for i, summary in enumerate(summaries) if summary is None]
+
+    if todo:
+        model.to(get_device())
+        inputs = tokenizer(
+            [texts[i] for i in todo], return_tensors="pt",
+            padding=True, max_length=max_input, truncation=True
+        ).to(get_device())
+
+        ids = model.generate(inputs["input_ids"], attention_mask=inputs["attention_mask"], **gen_params)
+
+        for i, summary in zip(todo, tokenizer.batch_decode(ids, skip_special_tokens=True)):
+            summaries[i] = summary
+            put_summary(chunks[i], cache_name, gen_params, summary)
+
+    return summaries
+
+
+def streaming_params(gen_params, tokenizer, on_partial):
+    """
+    Streamers only support single-beam decoding, so a streamed reduce switches
+    from beam search to greedy (with an n-gram block to keep it from looping).
+    """
+    if on_partial is None:
+        return gen_params
+
+    params = {k: v for k, v in gen_params.items() if k not in ("num_beams", "early_stopping")}
+    params.update(num_beams=1, no_repeat_ngram_size=3, streamer=callback_streamer(tokenizer, on_partial))
+    return params
+
 # ==============================================================================
 # STRATEGY 1: T5 (The "Classic" Encoder-Decoder)
 # Best for: Fast, short summaries. strict input limits (512 tokens).
 # ==============================================================================
 
-async def summarize_t5(tokenizer, model, chunks):
+async def summarize_t5(tokenizer, model, chunks, planner=None, trace=None):
     """
     MAP STEP: Process each chunk independently.
+    With a DeadlinePlanner, generation settings adapt to the time budget as chunks complete.
+    With a Trace, every model call is recorded as a "map_chunk" span (cache hits are not).
     """
-    model.to(DEVICE)
+    model.to(get_device())
 
     for idx, chunk in enumerate(chunks):
         logger.info("  > Starting T5 map step...")
 
+        params = planner.apply(T5_PARAMS) if planner else T5_PARAMS
+
+        # 0. Cache: unchanged chunks from earlier documents/revisions skip the model entirely
+        cached = await asyncio.to_thread(get_summary, chunk, "t5-small", params)
+        if cached is not None:
+            yield idx + 1, cached
+            continue
+
         # 1. Encode
         # T5 was trained with the specific prefix "summarize: "
         text = "summarize: " + chunk
 
         inputs = tokenizer.encode(
             text, return_tensors="pt", max_length=512, truncation=True
-        ).to(DEVICE)
+        ).to(get_device())
 
         # 2. Generate
-        ids = model.generate(
-            inputs,
-            max_length=SUMMARY_MAX_LENGTH,
-            min_length=SUMMARY_MIN_LENGTH,
-            num_beams=4,        # Looks at 4 possible futures at once (better quality)
-            early_stopping=True
-        )
+        started = time.perf_counter()
+        # In a thread: a multi-second generate() on the event loop would stall every other request
+        ids = await asyncio.to_thread(model.generate, inputs, **params)
+        elapsed = time.perf_counter() - started
+        if planner: planner.record(elapsed)
+        if trace: trace.record("map_chunk", elapsed)
 
         # 3. Decode
         summary = tokenizer.decode(ids[0], skip_special_tokens=True)
+        await asyncio.to_thread(put_summary, chunk, "t5-small", params, summary)
         
         # Yield result so frontend can update progress bar
         yield idx + 1, summary
-        await asyncio.to_thread(asyncio.sleep, 0.05)
+        await asyncio.sleep(0)
 
 
-async def finalize_t5(tokenizer, model, combined_summaries: str) -> str:
+async def finalize_t5(tokenizer, model, combined_summaries: str, on_partial=None, planner=None) -> str:
     """
     REDUCE STEP: Combine mini-summaries into one.
+    If 'on_partial' is given, it receives the text as it is generated.
     """
     logger.info("  > Starting T5 final 'Reduce' step...")
-    model.to(DEVICE)
+    model.to(get_device())
     
     text = "summarize: " + combined_summaries
     
     # 1. Encode
     inputs = tokenizer.encode(
         text, return_tensors="pt", max_length=512, truncation=True
-    ).to(DEVICE)
+    ).to(get_device())
 
     # 2. Generate
-    ids = await asyncio.to_thread(
-        model.generate,
-        inputs,
-        max_length=SUMMARY_MAX_LENGTH,
-        min_length=SUMMARY_MIN_LENGTH,
-        num_beams=4,
-        early_stopping=True
-    )
+    gen_params = planner.apply(T5_PARAMS) if planner else T5_PARAMS
+    ids = await asyncio.to_thread(model.generate, inputs, **streaming_params(gen_params, tokenizer, on_partial))
 
     # 3. Decode
     final_summary = tokenizer.decode(ids[0], skip_special_tokens=True)
     return final_summary
 
 
+def map_batch_t5(tokenizer, model, chunks):
+    """ MAP STEP (batched), see map_batch. """
+    texts = ["summarize: " + chunk for chunk in chunks]
+    return map_batch(tokenizer, model, texts, chunks, "t5-small", T5_PARAMS, 512)
+
+
 # ==============================================================================
 # STRATEGY 2: BART 
 # Best for: High quality, abstractive summarization. Handles 1024 tokens.
 # ==============================================================================
 
-async def summarize_bart(tokenizer, model, chunks):
-    """ MAP STEP """
+async def summarize_bart(tokenizer, model, chunks, planner=None, trace=None):
+    """ MAP STEP (see summarize_t5 for 'planner' and 'trace') """
     logger.info("  > Starting BART map step...")
-    model.to(DEVICE)
+    model.to(get_device())
 
     for idx, chunk in enumerate(chunks):
         logger.info(f"  > BART chunk {idx+0}/{len(chunks)}")
+
+        params = planner.apply(BART_PARAMS) if planner else BART_PARAMS
+
+        cached = await asyncio.to_thread(get_summary, chunk, "bart-large-cnn", params)
+        if cached is not None:
+            yield idx + 1, cached
+            continue
         
         inputs = tokenizer(
             chunk, return_tensors="pt",
             max_length=1024, truncation=True
-        ).to(DEVICE)
+        ).to(get_device())
 
-        ids = model.generate(
-            inputs["input_ids"],
-            max_length=SUMMARY_MAX_LENGTH,
-            min_length=SUMMARY_MIN_LENGTH,
-            num_beams=4,
-            length_penalty=2.0, # Encourages slightly longer, more detailed outputs
-            early_stopping=True
-        )
+        started = time.perf_counter()
+        ids = await asyncio.to_thread(model.generate, inputs["input_ids"], **params)
+        elapsed = time.perf_counter() - started
+        if planner: planner.record(elapsed)
+        if trace: trace.record("map_chunk", elapsed)
 
         summary = tokenizer.decode(ids[0], skip_special_tokens=True)
+        await asyncio.to_thread(put_summary, chunk, "bart-large-cnn", params, summary)
         yield idx + 1, summary
-        await asyncio.sleep(0.05)
+        await asyncio.sleep(0)
 
 
-async def finalize_bart(tokenizer, model, combined_summaries: str) -> str:
+async def finalize_bart(tokenizer, model, combined_summaries: str, on_partial=None, planner=None) -> str:
     """ REDUCE STEP """
     logger.info("  > Starting BART final 'Reduce' step...")
-    model.to(DEVICE)
+    model.to(get_device())
 
     inputs = tokenizer(
         combined_summaries, return_tensors="pt",
         max_length=1024, truncation=True
-    ).to(DEVICE)
+    ).to(get_device())
 
+    gen_params = planner.apply(BART_PARAMS) if planner else BART_PARAMS
     ids = await asyncio.to_thread(
-        model.generate,
-        inputs["input_ids"],
-        max_length=SUMMARY_MAX_LENGTH,
-        min_length=SUMMARY_MIN_LENGTH,
-        num_beams=4,
-        length_penalty=2.0,
-        early_stopping=True
+        model.generate, inputs["input_ids"], **streaming_params(gen_params, tokenizer, on_partial)
     )
 
     final_summary = tokenizer.decode(ids[0], skip_special_tokens=True)
     return final_summary
 
 
+def map_batch_bart(tokenizer, model, chunks):
+    """ MAP STEP (batched), see map_batch. """
+    return map_batch(tokenizer, model, chunks, chunks, "bart-large-cnn", BART_PARAMS, 1024)
+
+
 # ==============================================================================
 # STRATEGY 3: MISTRAL (The Local LLM)
 # Best for: Instruction following, works with prompts
 # ==============================================================================
 
-async def summarize_mistral(model, chunks):
-    """ MAP STEP """
+# The fixed part of every map prompt. ctransformers only evaluates the prompt tokens that differ from
+# what is already in its context, so by starting every chunk's prompt with the *same token ids*
+# the instruction is evaluated once and reused for all following chunks.
+MISTRAL_MAP_PREFIX = (
+    "[INST] Analyze the text below and extract the key information. "
+    "Focus on capturing main ideas. Output a concise list of bullet points. "
+    "Text:"
+)
+MISTRAL_MAP_SUFFIX = " [/INST]\nKey Points:"
+
+
+def mistral_map_tokens(model, prefix_ids, chunk):
+    """ Prompt tokens for one chunk: the shared, pre-tokenized prefix + this chunk's own tokens. """
+    return list(prefix_ids) + model.tokenize(f"{chunk}{MISTRAL_MAP_SUFFIX}", add_bos_token=False)
+
+
+def mistral_cache_params(params):
+    """
+    Cache key settings for a Mistral map call. max_new_tokens follows the chunk count (and the deadline level),
+    so only its power-of-two bucket goes in: one chunk more or less keeps the document's keys.
+    """
+    bucket = 1 << (params["max_new_tokens"] - 1).bit_length()
+    return {**{k: v for k, v in params.items() if k != "max_new_tokens"}, "max_new_tokens_bucket": bucket}
+
+
+def fit_tokens(model, text, max_tokens):
+    """ Cuts a cached summary down to 'max_tokens' (a hit from the same bucket can be up to twice as long). """
+    tokens = model.tokenize(text, add_bos_token=False)
+    return text if len(tokens) <= max_tokens else model.detokenize(tokens[:max_tokens]).strip()
+
+
+def mistral_generate(model, tokens, max_new_tokens, **sampling):
+    """ Token-level version of model(prompt): generates from prompt tokens and returns the new text. """
+    out = []
+    for token in model.generate(tokens, **sampling):
+        out.append(token)
+        if len(out) >= max_new_tokens:
+            break
+    return model.detokenize(out)
+
+
+async def summarize_mistral(model, chunks, planner=None, trace=None):
+    """ MAP STEP (see summarize_t5 for 'planner' and 'trace') """
     logger.info(f"  > Starting Mistral map step...")
     total_chunks = len(chunks)
     
@@ -151,36 +282,49 @@ async def summarize_mistral(model, chunks):
     safe_final_context = 3500
     dynamic_max_tokens = max(100, min(350, safe_final_context // total_chunks))
 
+    gen_params = dict(
+        max_new_tokens=dynamic_max_tokens,
+        temperature=0.1,       # Low creativity (strict facts)
+        repetition_penalty=1.15 
+    )
+
+    # Tokenized once, reused by every chunk (see MISTRAL_MAP_PREFIX)
+    prefix_ids = model.tokenize(MISTRAL_MAP_PREFIX)
+
     for idx, chunk in enumerate(chunks):
         logger.info(f"  > Processing Mistral chunk {idx + 1}/{total_chunks}")
         
         clean_chunk = chunk.replace("\n", " ").strip()
         if len(clean_chunk) < 30: continue
 
-        prompt = (
-            f"[INST] Analyze the text below and extract the key information. "
-            f"Focus on capturing main ideas. Output a concise list of bullet points. "
-            f"Text: {clean_chunk} [/INST]\nKey Points:"
-        )
+        params = planner.apply(gen_params) if planner else gen_params
+
+        # The summaries of a large document must stay short enough for finalize_mistral's 4096-token context
+        cache_params = mistral_cache_params(params)
+        cached = await asyncio.to_thread(get_summary, clean_chunk, "mistral", cache_params)
+        if cached is not None:
+            yield idx + 1, fit_tokens(model, cached, params["max_new_tokens"])
+            continue
+
+        tokens = mistral_map_tokens(model, prefix_ids, clean_chunk)
 
-        summary_raw = await asyncio.to_thread(
-            model,
-            prompt,
-            max_new_tokens=dynamic_max_tokens,
-            temperature=0.1,       # Low creativity (strict facts)
-            repetition_penalty=1.15 
-        )
+        started = time.perf_counter()
+        summary_raw = await asyncio.to_thread(mistral_generate, model, tokens, **params)
+        elapsed = time.perf_counter() - started
+        if planner: planner.record(elapsed)
+        if trace: trace.record("map_chunk", elapsed)
 
         # Text Cleanup: Remove the prompt and the instruction tags from the output
         summary = summary_raw.replace("[/INST]", "").replace("Key Points:", "").strip()
+        await asyncio.to_thread(put_summary, clean_chunk, "mistral", cache_params, summary)
         
         if not summary: summary = clean_chunk 
         
         yield idx + 1, summary
-        await asyncio.sleep(0.05)
+        await asyncio.sleep(0)
 
 
-async def finalize_mistral(model, combined_summaries: str) -> str:
+async def finalize_mistral(model, combined_summaries: str, on_partial=None, planner=None) -> str:
     """ REDUCE STEP """
     logger.info("  > Starting Mistral final 'Reduce' step...")
 
@@ -194,13 +338,25 @@ async def finalize_mistral(model, combined_summaries: str) -> str:
         f"[/INST]\nSummary:"
     )
 
-    final_summary_raw = await asyncio.to_thread(
-        model,
-        final_prompt,
+    gen_params = dict(
         max_new_tokens=800,
         temperature=0.1, 
         repetition_penalty=1.15 
     )
+    if planner: gen_params = planner.apply(gen_params)
+
+    def generate():
+        if on_partial is None:
+            return model(final_prompt, **gen_params)
+
+        # ctransformers yields the new text piece by piece with stream=True
+        pieces = []
+        for piece in model(final_prompt, stream=True, **gen_params):
+            pieces.append(piece)
+            on_partial(piece)
+        return "".join(pieces)
+
+    final_summary_raw = await asyncio.to_thread(generate)
 
     if "Summary:" in final_summary_raw:
         result = final_summary_raw.split("Summary:")[-1]
@@ -218,24 +374,36 @@ async def finalize_mistral(model, combined_summaries: str) -> str:
 # Best for: Unlimited power, but requires internet and API Key.
 # ==============================================================================
 
-async def summarize_api(chunks):
-    """ MAP STEP """
+async def summarize_api(chunks, trace=None):
+    """ MAP STEP (see summarize_t5 for 'trace') """
     logger.info(f"  > Starting API map step...")
+    import google.generativeai as genai
     genai.configure(api_key=GOOGLE_NLP_API_KEY)
     model = genai.GenerativeModel("gemini-2.5-flash")
+    gen_params = {"model": "gemini-2.5-flash", "prompt": "Summarize:"}
 
     for idx, chunk in enumerate(chunks):
+        cached = await asyncio.to_thread(get_summary, chunk, "api", gen_params)
+        if cached is not None:
+            yield idx + 1, cached
+            continue
+
         prompt = f"Summarize:\n{chunk}"
+        started = time.perf_counter()
         response = await asyncio.to_thread(model.generate_content, prompt)
+        if trace: trace.record("map_chunk", time.perf_counter() - started)
         
-        summary = getattr(response, "text", "").strip() or "(Empty response)"
+        summary = getattr(response, "text", "").strip()
+        await asyncio.to_thread(put_summary, chunk, "api", gen_params, summary)
+        summary = summary or "(Empty response)"
         yield idx + 1, summary
-        await asyncio.sleep(0.05)
+        await asyncio.sleep(0)
 
 
-async def finalize_api(combined_summaries: str) -> str:
+async def finalize_api(combined_summaries: str, on_partial=None) -> str:
     """ REDUCE STEP """
     logger.info("  > Starting Gemini API final 'Reduce' step...")
+    import google.generativeai as genai
     genai.configure(api_key=GOOGLE_NLP_API_KEY)
     model = genai.GenerativeModel("gemini-pro") # Stronger model for final synthesis
 
@@ -244,11 +412,46 @@ async def finalize_api(combined_summaries: str) -> str:
         f"### Partial Summaries:\n{combined_summaries}"
     )
 
+    def generate():
+        if on_partial is None:
+            return getattr(model.generate_content(final_prompt), "text", "")
+
+        # Streamed response: each part carries the next slice of text
+        pieces = []
+        for part in model.generate_content(final_prompt, stream=True):
+            text = getattr(part, "text", "")
+            if text:
+                pieces.append(text)
+                on_partial(text)
+        return "".join(pieces)
+
     try:
-        response = await asyncio.to_thread(model.generate_content, final_prompt)
-        final_summary = getattr(response, "text", "").strip() or "(Empty response)"
+        final_summary = (await asyncio.to_thread(generate)).strip() or "(Empty response)"
     except Exception as e:
         logger.error(f"Gemini API finalizer error: {e}")
         final_summary = f"(Error: {e})"
 
-    return final_summary
\ No newline at end of file
+    return final_summary
+
+
+# ==============================================================================
+# STRATEGY 5: INSTANT (Pure Extractive)
+# Best for: A quick preview in seconds. No neural model, picks the key sentences.
+# ==============================================================================
+
+async def summarize_instant(chunks, trace=None):
+    """ MAP STEP (see summarize_t5 for 'trace') """
+    logger.info("  > Starting Instant (extractive) map step...")
+
+    for idx, chunk in enumerate(chunks):
+        started = time.perf_counter()
+        summary = extractive_summary(chunk, INSTANT_CHUNK_SENTENCES)
+        if trace: trace.record("map_chunk", time.perf_counter() - started)
+        yield idx + 1, summary or chunk.strip()
+        await asyncio.sleep(0)
+
+
+async def finalize_instant(combined_summaries: str) -> str:
+    """ REDUCE STEP """
+    logger.info("  > Starting Instant (extractive) final 'Reduce' step...")
+    return await asyncio.to_thread(extractive_summary, combined_summaries, INSTANT_FINAL_SENTENCES)
@@ -0,0 +1,167 @@
+# ==========================================
+# 1. IMPORTS & SETUP
+# ==========================================
+
+# Third-Party Libraries
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+import contextvars
+
+# Local Logic
+from app.config import SUMMARY_CACHE_ENABLED, SUMMARY_CACHE_PATH, SUMMARY_CACHE_MAX_ENTRIES
+
+# Logger setup to print info to console
+logger = logging.getLogger("uvicorn.error")
+
+# ==========================================
+# 2. THE STORE (SQLite, persistent across restarts)
+# ==========================================
+# One row per chunk summary. Keys are content hashes, so the same paragraph in
+# revision 1 and revision 7 of a contract (or in two different reports) hits the same row.
+_conn = None
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0}
+_entries = 0         # Running row count (no COUNT(*) per insert)
+_touched = {}        # key -> last_used, written in batches instead of one UPDATE + commit per hit
+TOUCH_BATCH = 64
+
+# Hit/miss counters of the current request (see track_request). Copied into worker threads by asyncio.to_thread.
+_request_stats = contextvars.ContextVar("summary_cache_request_stats", default=None)
+
+
+def _get_conn():
+    global _conn, _entries
+
+    if _conn is None:
+        folder = os.path.dirname(SUMMARY_CACHE_PATH)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+
+        _conn = sqlite3.connect(SUMMARY_CACHE_PATH, check_same_thread=False)
+        _conn.execute(
+            "CREATE TABLE IF NOT EXISTS summaries ("
+            " key TEXT PRIMARY KEY, summary TEXT NOT NULL, last_used REAL NOT NULL)"
+        )
+        _conn.execute("CREATE INDEX IF NOT EXISTS idx_last_used ON summaries(last_used)")
+        _conn.commit()
+        (_entries,) = _conn.execute("SELECT COUNT(*) FROM summaries").fetchone()
+
+    return _conn
+
+
+def make_key(chunk, model_name, params):
+    """
+    Hash of the chunk's normalized text + model + generation parameters.
+    Whitespace differences (re-flowed PDF lines) don't change the key; any parameter change does.
+    """
+    normalized = " ".join(chunk.split())
+    payload = json.dumps([model_name, params, normalized], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _count(outcome):
+    _stats[outcome] += 1
+    request = _request_stats.get()
+    if request is not None:
+        request[outcome] += 1
+
+
+def _flush_touches(conn):
+    """ Writes the pending last_used updates (caller holds the lock and commits). """
+    if _touched:
+        conn.executemany("UPDATE summaries SET last_used = ? WHERE key = ?", [(t, k) for k, t in _touched.items()])
+        _touched.clear()
+
+# ==========================================
+# 3. PUBLIC API
+# ==========================================
+def get_summary(chunk, model_name, params):
+    """
+    Returns the cached summary for this chunk, or None.
+    Blocking (SQLite): async callers run it with asyncio.to_thread.
+    """
+    if not SUMMARY_CACHE_ENABLED:
+        return None
+
+    key = make_key(chunk, model_name, params)
+    with _lock:
+        conn = _get_conn()
+        row = conn.execute("SELECT summary FROM summaries WHERE key = ?", (key,)).fetchone()
+
+        if row is None:
+            _count("misses")
+            return None
+
+        # Touch the row so eviction stays least-recently-used (written in batches)
+        _touched[key] = time.time()
+        if len(_touched) >= TOUCH_BATCH:
+            _flush_touches(conn)
+            conn.commit()
+        _count("hits")
+        return row[0]
+
+
+def put_summary(chunk, model_name, params, summary):
+    """
+    Stores a fresh summary and evicts the oldest rows past SUMMARY_CACHE_MAX_ENTRIES.
+    Blocking (SQLite): async callers run it with asyncio.to_thread.
+    """
+    global _entries
+    if not SUMMARY_CACHE_ENABLED or not summary:
+        return
+
+    key = make_key(chunk, model_name, params)
+    with _lock:
+        conn = _get_conn()
+        now = time.time()
+        inserted = conn.execute(
+            "INSERT OR IGNORE INTO summaries (key, summary, last_used) VALUES (?, ?, ?)", (key, summary, now)
+        ).rowcount
+        if inserted:
+            _entries += 1
+        else:
+            conn.execute("UPDATE summaries SET summary = ?, last_used = ? WHERE key = ?", (summary, now, key))
+        _touched.pop(key, None)
+
+        # Pending touches go first, so eviction sees the real recency
+        _flush_touches(conn)
+        overflow = _entries - SUMMARY_CACHE_MAX_ENTRIES
+        if overflow > 0:
+            _entries -= conn.execute(
+                "DELETE FROM summaries WHERE key IN "
+                "(SELECT key FROM summaries ORDER BY last_used ASC LIMIT ?)",
+                (overflow,)
+            ).rowcount
+        conn.commit()
+
+
+def track_request():
+    """
+    Starts counting hits/misses for the current request (asyncio task) only, so concurrent
+    requests don't inflate each other's CACHE line. Returns the live {"hits", "misses"} dict.
+    """
+    counts = {"hits": 0, "misses": 0}
+    _request_stats.set(counts)
+    return counts
+
+
+def cache_stats():
+    """ Hit/miss counters since process start, plus the current number of stored summaries. """
+    with _lock:
+        hits, misses = _stats["hits"], _stats["misses"]
+        if SUMMARY_CACHE_ENABLED:
+            _get_conn()
+        entries = _entries
+
+    lookups = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": hits / lookups if lookups else 0.0,
+        "entries": entries,
+    }
@@ -0,0 +1,118 @@
+# ==========================================
+# 1. IMPORTS & SETUP
+# ==========================================
+
+# Third-Party Libraries
+import re
+import hashlib
+import logging
+from collections import Counter
+
+# Local Logic
+from app.config import FURNITURE_MIN_PAGES, FURNITURE_PAGE_RATIO, SIMHASH_MAX_DISTANCE
+
+# Logger setup to print info to console
+logger = logging.getLogger("uvicorn.error")
+
+_DIGITS = re.compile(r'\d+')
+_WORD = re.compile(r"[a-z0-9]+")
+
+# ==========================================
+# 2. PAGE FURNITURE (Headers, Footers, Page Numbers)
+# ==========================================
+
+def _line_key(line):
+    """
+    Normalizes a line so "Page 3 of 40" and "Page 4 of 40" look the same.
+    Case and spacing are ignored; in short lines digits become '#'
+    (long lines keep them so numbered content is never mistaken for a footer).
+    """
+    words = line.lower().split()
+    key = " ".join(words)
+    return _DIGITS.sub("#", key) if len(words) <= 6 else key
+
+
+def find_furniture(pages, min_pages=FURNITURE_MIN_PAGES, page_ratio=FURNITURE_PAGE_RATIO):
+    """
+    Normalized keys (see _line_key) of the lines that repeat on many pages: on at least
+    'min_pages' pages and on at least 'page_ratio' of all pages. 'pages' are lists of lines.
+    """
+    if len(pages) < min_pages:
+        return set()
+
+    # On how many pages does each normalized line appear?
+    page_counts = Counter()
+    for lines in pages:
+        page_counts.update({_line_key(l) for l in lines if l.strip()})
+
+    threshold = max(min_pages, int(len(pages) * page_ratio))
+    return {k for k, c in page_counts.items() if c >= threshold}
+
+
+def is_furniture(line, furniture):
+    return bool(line.strip()) and _line_key(line) in furniture
+
+
+def strip_page_furniture(pages, min_pages=FURNITURE_MIN_PAGES, page_ratio=FURNITURE_PAGE_RATIO):
+    """
+    Removes lines that repeat on many pages (headers, footers, disclaimers, page numbers).
+    Returns (cleaned_pages, removed_line_count).
+    """
+    # A. COUNT
+    furniture = find_furniture([page.splitlines() for page in pages], min_pages, page_ratio)
+
+    if not furniture:
+        return pages, 0
+
+    # B. STRIP
+    cleaned, removed = [], 0
+    for page in pages:
+        kept = []
+        for line in page.splitlines():
+            if is_furniture(line, furniture):
+                removed += 1
+            else:
+                kept.append(line)
+        cleaned.append("\n".join(kept) + "\n")
+
+    logger.info(f"Stripped {removed} repeated header/footer lines ({len(furniture)} distinct)")
+    return cleaned, removed
+
+# ==========================================
+# 3. NEAR-DUPLICATE CHUNKS (SimHash)
+# ==========================================
+
+def simhash(text, shingle=3):
+    """ 64-bit SimHash over word shingles. Similar texts get fingerprints a few bits apart. """
+    words = _WORD.findall(text.lower())
+    if len(words) < shingle:
+        words = words + [""] * (shingle - len(words))
+
+    weights = [0] * 64
+    for i in range(len(words) - shingle + 1):
+        h = int.from_bytes(hashlib.blake2b(" ".join(words[i:i + shingle]).encode(), digest_size=8).digest(), "big")
+        for bit in range(64):
+            weights[bit] += 1 if (h >> bit) & 1 else -1
+
+    return sum(1 << bit for bit in range(64) if weights[bit] > 0)
+
+
+def drop_near_duplicates(chunks, max_distance=SIMHASH_MAX_DISTANCE):
+    """
+    Keeps the first occurrence of each chunk and drops later ones whose SimHash
+    is within 'max_distance' bits of a kept chunk. Returns (kept_chunks, skipped_count).
+    """
+    kept, fingerprints = [], []
+
+    for chunk in chunks:
+        fp = simhash(chunk)
+        if any(bin(fp ^ other).count("1") <= max_distance for other in fingerprints):
+            continue
+
+        kept.append(chunk)
+        fingerprints.append(fp)
+
+    skipped = len(chunks) - len(kept)
+    if skipped:
+        logger.info(f"Skipped {skipped}/{len(chunks)} near-duplicate chunks")
+    return kept, skipped
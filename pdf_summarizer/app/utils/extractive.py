@@ -0,0 +1,172 @@
+# ==========================================
+# 1. IMPORTS & SETUP
+# ==========================================
+
+# Third-Party Libraries
+import re
+import logging
+from collections import Counter
+
+import numpy as np
+
+# Local Logic
+from app.utils.text_utils import count_tokens
+
+# Logger setup to print info to console
+logger = logging.getLogger("uvicorn.error")
+
+# Sentence boundary: end punctuation followed by whitespace and something that looks like a new sentence
+_SENTENCE_SPLIT = re.compile(r'(?<=[.!?])\s+(?=[A-Z0-9"\'(\[])')
+_WORD = re.compile(r"[a-z0-9]+")
+
+MAX_FEATURES = 4096           # Vocabulary cap, keeps the TF-IDF matrix small on huge documents
+TEXTRANK_MAX_SENTENCES = 1500 # Above this the n*n similarity matrix gets too big, fall back to centroid scoring
+MIN_SENTENCE_WORDS = 4        # Drops fragments like page numbers and lone headings
+
+# ==========================================
+# 2. HELPERS (Vectorized Scoring)
+# ==========================================
+
+def split_sentences(text):
+    """ Flattens whitespace and splits into sentences, dropping tiny fragments. """
+    flat = re.sub(r'\s+', ' ', text).strip()
+    sentences = [s.strip() for s in _SENTENCE_SPLIT.split(flat)]
+    return [s for s in sentences if len(s.split()) >= MIN_SENTENCE_WORDS]
+
+
+def tfidf_matrix(sentences):
+    """
+    Builds an L2-normalized TF-IDF matrix (sentences x vocabulary) with NumPy, in sparse form.
+    Returns (rows, cols, values, shape): one entry per distinct (sentence, word) pair, sorted by sentence.
+    A dense matrix would be sentences x MAX_FEATURES floats (~200 MB at 12k sentences) for a handful of words per row.
+    """
+    tokenized = [_WORD.findall(s.lower()) for s in sentences]
+
+    df = Counter()
+    for toks in tokenized:
+        df.update(set(toks))
+    vocab = {w: i for i, (w, _) in enumerate(df.most_common(MAX_FEATURES))}
+
+    # Sparse (row, col) pairs; np.unique merges repeats of a word within a sentence into its term frequency
+    rows, cols = [], []
+    for r, toks in enumerate(tokenized):
+        for t in toks:
+            c = vocab.get(t)
+            if c is not None:
+                rows.append(r)
+                cols.append(c)
+
+    n, width = len(sentences), max(len(vocab), 1)
+    keys, tf = np.unique(np.array(rows, dtype=np.int64) * width + np.array(cols, dtype=np.int64), return_counts=True)
+    rows, cols = keys // width, keys % width
+
+    df_arr = np.array([df[w] for w in vocab], dtype=np.float32)
+    idf = np.log((1.0 + n) / (1.0 + df_arr)) + 1.0
+
+    values = tf.astype(np.float32)
+    values *= idf[cols]
+    norms = np.sqrt(np.bincount(rows, weights=values * values, minlength=n)).astype(np.float32)
+    values /= norms[rows]  # Rows with no entries have no values to divide
+    return rows, cols, values, (n, len(vocab))
+
+
+def to_dense(m):
+    """ The sparse TF-IDF matrix as a dense array (fine for up to TEXTRANK_MAX_SENTENCES rows). """
+    rows, cols, values, shape = m
+    dense = np.zeros(shape, dtype=np.float32)
+    dense[rows, cols] = values
+    return dense
+
+
+def textrank_scores(m, damping=0.85, max_iter=50, tol=1e-6):
+    """ PageRank over the cosine-similarity graph of sentences (power iteration). """
+    dense = to_dense(m)
+    n = dense.shape[0]
+    sim = dense @ dense.T
+    np.fill_diagonal(sim, 0.0)
+
+    row_sums = sim.sum(axis=1, keepdims=True)
+    row_sums[row_sums == 0] = 1.0
+    transition = (sim / row_sums).T
+
+    scores = np.full(n, 1.0 / n, dtype=np.float32)
+    for _ in range(max_iter):
+        new_scores = (1.0 - damping) / n + damping * (transition @ scores)
+        if np.abs(new_scores - scores).sum() < tol:
+            return new_scores
+        scores = new_scores
+    return scores
+
+
+def centroid_scores(m):
+    """ Cheap O(n) alternative: similarity of each sentence to the document's mean vector, without densifying. """
+    rows, cols, values, (n, width) = m
+    centroid = np.bincount(cols, weights=values, minlength=width) / n
+    norm = np.linalg.norm(centroid)
+    if norm == 0:
+        return np.zeros(n, dtype=np.float32)
+    return np.bincount(rows, weights=values * (centroid / norm)[cols], minlength=n).astype(np.float32)
+
+
+def score_sentences(sentences):
+    m = tfidf_matrix(sentences)
+    if len(sentences) <= TEXTRANK_MAX_SENTENCES:
+        return textrank_scores(m)
+    return centroid_scores(m)
+
+# ==========================================
+# 3. MAIN PROCESS
+# ==========================================
+
+def select_sentences(sentences, keep_ratio, token_budget=None, tokenizer=None):
+    """
+    Keeps the best-scoring sentences: at most 'keep_ratio' of them and at most
+    'token_budget' tokens in total. Returns them in their original order.
+    """
+    if not sentences:
+        return []
+
+    scores = score_sentences(sentences)
+    max_keep = max(1, int(round(len(sentences) * keep_ratio)))
+
+    kept, used = [], 0
+    for i in np.argsort(-scores, kind="stable"):
+        if len(kept) >= max_keep:
+            break
+
+        cost = count_tokens(sentences[i], tokenizer)
+        if token_budget is not None and kept and used + cost > token_budget:
+            continue
+
+        kept.append(int(i))
+        used += cost
+
+    return [sentences[i] for i in sorted(kept)]
+
+
+def prefilter_chunks(chunks, keep_ratio, token_budget=None, tokenizer=None):
+    """
+    Extractive stage between chunking and the map step.
+    Scores every sentence of the document at once and returns the kept sentences
+    (in document order), ready to be re-chunked for the abstractive model.
+    """
+    sentences, seen = [], set()
+    for chunk in chunks:
+        for s in split_sentences(chunk):
+            # Overlapping chunks repeat sentences, score each one once
+            if s not in seen:
+                seen.add(s)
+                sentences.append(s)
+
+    kept = select_sentences(sentences, keep_ratio, token_budget, tokenizer)
+    logger.info(f"Extractive pre-filter kept {len(kept)}/{len(sentences)} sentences")
+    return kept
+
+
+def extractive_summary(text, max_sentences):
+    """ Pure extractive summary: the top 'max_sentences' sentences, in order. """
+    sentences = split_sentences(text)
+    if len(sentences) <= max_sentences:
+        return " ".join(sentences)
+
+    return " ".join(select_sentences(sentences, max_sentences / len(sentences)))
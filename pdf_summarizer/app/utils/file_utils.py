@@ -0,0 +1,170 @@
+# ==========================================
+# 1. IMPORTS & SETUP
+# ==========================================
+
+# Third-Party Libraries
+import hashlib
+import logging
+import os
+import zipfile
+import tempfile
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse, StreamingResponse
+
+# Local Logic
+from app.config import UPLOAD_DIR, MAX_UPLOAD_MB, UPLOAD_READ_SIZE
+
+# Logger setup to print info to console
+logger = logging.getLogger("uvicorn.error")
+
+
+class UploadTooLargeError(Exception):
+    """ Raised while spooling when the upload exceeds MAX_UPLOAD_MB (the routes turn it into a 413). """
+
+
+# ==========================================
+# 2. MAIN PROCESS
+# ==========================================
+async def spool_upload(file, max_mb=MAX_UPLOAD_MB):
+    """
+    Streams an UploadFile to a temp file under UPLOAD_DIR, one block at a time,
+    so memory use stays flat no matter how big the PDF is.
+    Returns (path, sha256_hex). The caller owns the file and must remove it.
+    """
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    limit = max_mb * 1024 * 1024
+
+    fd, path = tempfile.mkstemp(suffix=".pdf", dir=UPLOAD_DIR)
+    digest = hashlib.sha256()
+    size = 0
+
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                block = await file.read(UPLOAD_READ_SIZE)
+                if not block:
+                    break
+
+                # Enforce the limit as we go, not after the whole file is on disk
+                size += len(block)
+                if size > limit:
+                    raise UploadTooLargeError(f"File exceeds the {max_mb} MB upload limit.")
+
+                digest.update(block)
+                out.write(block)
+    except BaseException:
+        remove_quietly(path)
+        raise
+
+    logger.info(f"Spooled upload to {path} ({size / 1024 / 1024:.1f} MB)")
+    return path, digest.hexdigest()
+
+
+def unpack_zip(zip_path, max_mb=MAX_UPLOAD_MB):
+    """
+    Copies every PDF inside a spooled zip to its own temp file under UPLOAD_DIR.
+    The uncompressed total is capped at 'max_mb' (zip bomb guard).
+    Returns a list of (name, path); the caller owns the files.
+    """
+    limit = max_mb * 1024 * 1024
+    total = 0
+    unpacked = []
+
+    try:
+        with zipfile.ZipFile(zip_path) as archive:
+            for info in archive.infolist():
+                if info.is_dir() or not info.filename.lower().endswith(".pdf"):
+                    continue
+
+                fd, path = tempfile.mkstemp(suffix=".pdf", dir=UPLOAD_DIR)
+                unpacked.append((os.path.basename(info.filename), path))
+
+                with archive.open(info) as src, os.fdopen(fd, "wb") as out:
+                    while True:
+                        block = src.read(UPLOAD_READ_SIZE)
+                        if not block:
+                            break
+
+                        total += len(block)
+                        if total > limit:
+                            raise UploadTooLargeError(f"Zip contents exceed the {max_mb} MB upload limit.")
+                        out.write(block)
+    except BaseException:
+        for _, path in unpacked:
+            remove_quietly(path)
+        raise
+
+    return unpacked
+
+
+def remove_quietly(path):
+    """ Deletes a spooled file, ignoring the case where it is already gone. """
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class BodyLimitMiddleware:
+    """
+    Rejects request bodies over a per-route limit before the route reads them.
+    Starlette writes the whole multipart body to a temp file before the endpoint runs,
+    so spool_upload's own check only fires once the upload has already been received.
+    'limits' maps a POST path to its limit in MB.
+    """
+
+    # Room for the multipart boundaries and the small form fields next to the file(s)
+    FORM_OVERHEAD = 1024 * 1024
+
+    def __init__(self, app, limits):
+        self.app = app
+        self.limits = limits
+
+    async def __call__(self, scope, receive, send):
+        max_mb = self.limits.get(scope["path"]) if scope["type"] == "http" and scope["method"] == "POST" else None
+        if max_mb is None:
+            await self.app(scope, receive, send)
+            return
+
+        limit = max_mb * 1024 * 1024 + self.FORM_OVERHEAD
+        detail = f"Upload exceeds the {max_mb} MB limit."
+
+        # A declared size over the limit: answer right away, without reading the body
+        length = dict(scope["headers"]).get(b"content-length", b"")
+        if length.isdigit() and int(length) > limit:
+            await JSONResponse({"detail": detail}, status_code=413)(scope, receive, send)
+            return
+
+        # Chunked (or understated) bodies: count the bytes as they arrive.
+        # FastAPI re-raises an HTTPException from the body parser as is, so this becomes a 413 too.
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    raise HTTPException(status_code=413, detail=detail)
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+class SpooledStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse that deletes the spooled upload(s) however the response ends:
+    normal end, error, or a client that disconnects before the body even starts
+    (then the content generator never runs, so its own 'finally' can't clean up).
+    """
+
+    def __init__(self, content, paths, **kwargs):
+        super().__init__(content, **kwargs)
+        self.paths = paths
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            for path in self.paths:
+                remove_quietly(path)
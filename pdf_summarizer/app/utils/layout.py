@@ -0,0 +1,151 @@
+# ==========================================
+# 1. IMPORTS & SETUP
+# ==========================================
+# Rebuilds a document's section structure from PyMuPDF's layout information:
+# every text line comes with its font size and flags, and headings are the short
+# lines set in a larger (or bold) font. The result is a list of (title, text)
+# sections that the chunker can cut along instead of at arbitrary blank lines.
+
+# Third-Party Libraries
+import re
+import logging
+from collections import Counter
+
+# Local Logic
+from app.utils.dedup import find_furniture, is_furniture
+from app.config import HEADING_SIZE_RATIO, HEADING_MAX_WORDS, HEADING_MAX_LEVELS
+
+# Logger setup to print info to console
+logger = logging.getLogger("uvicorn.error")
+
+_BOLD = 16  # PyMuPDF span flag
+_NUMBERED = re.compile(r'^\d+(\.\d+)*\.?\s')  # "2 ", "1.3 ", "4.2.1. ": always the start of a new heading
+
+# ==========================================
+# 2. LINES WITH FONT INFORMATION
+# ==========================================
+
+def _page_lines(page):
+    """
+    One dict per text line of the page, in reading order:
+    {"text", "size" (largest span, rounded to 0.5pt), "bold" (every span bold), "block" (block number),
+     "baseline" (y of the first span's origin)}.
+    """
+    lines = []
+    for block_no, block in enumerate(page.get_text("dict")["blocks"]):
+        if block.get("type") != 0:  # Images
+            continue
+
+        for line in block["lines"]:
+            spans = [s for s in line["spans"] if s["text"].strip()]
+            if not spans:
+                continue
+
+            lines.append({
+                "text": " ".join(s["text"].strip() for s in spans),
+                "size": round(max(s["size"] for s in spans) * 2) / 2,
+                "bold": all(s["flags"] & _BOLD for s in spans),
+                "block": block_no,
+                "baseline": spans[0]["origin"][1],
+            })
+    return lines
+
+
+def _body_size(pages):
+    """ The font size most of the text is set in (weighted by characters). """
+    sizes = Counter()
+    for lines in pages:
+        for line in lines:
+            sizes[line["size"]] += len(line["text"])
+    return sizes.most_common(1)[0][0] if sizes else 0
+
+
+def _is_heading(line, body_size):
+    text = line["text"]
+    if len(text.split()) > HEADING_MAX_WORDS or text.endswith((".", ",", ";", ":")):
+        return False
+    return line["size"] >= body_size * HEADING_SIZE_RATIO or (line["bold"] and line["size"] >= body_size)
+
+
+def _continues_title(line, previous):
+    """
+    Whether heading 'line' is the rest of heading 'previous' (a title that wrapped or was set in pieces)
+    rather than a heading of its own: same size, not numbered, and in the same block or on the same baseline.
+    """
+    if previous is None or line["size"] != previous["size"] or _NUMBERED.match(line["text"]):
+        return False
+    return line["block"] == previous["block"] or abs(line["baseline"] - previous["baseline"]) < 1
+
+# ==========================================
+# 3. MAIN PROCESS
+# ==========================================
+
+def extract_sections(doc):
+    """
+    PyMuPDF document -> [(title, text), ...] in reading order.
+    'title' is the heading path ("2 Results > 2.1 Revenue"), "" for text before the first heading.
+    Paragraphs (PyMuPDF blocks) are separated by blank lines; headers and footers repeated
+    across pages are dropped. A document without detectable headings comes back as one untitled section.
+    """
+    pages = [_page_lines(page) for page in doc]
+    furniture = find_furniture([[l["text"] for l in lines] for lines in pages])
+    body_size = _body_size(pages)
+
+    # A. HEADING LEVELS: every distinct heading size is a level, largest first (bold body text comes last)
+    headings = [l for lines in pages for l in lines if _is_heading(l, body_size) and not is_furniture(l["text"], furniture)]
+    sizes = sorted({l["size"] for l in headings}, reverse=True)
+
+    def level(line):
+        return min(sizes.index(line["size"]) + 1, HEADING_MAX_LEVELS)
+
+    # B. WALK THE LINES
+    sections = []
+    path = []           # Current heading at each level
+    paragraphs = []     # Finished paragraphs of the current section
+    paragraph = []      # Lines of the paragraph being read
+    last_block = None
+    last_heading = None  # Heading line with no text after it yet (a wrapped title may continue it)
+
+    def close_paragraph():
+        if paragraph:
+            paragraphs.append(" ".join(paragraph))
+            paragraph.clear()
+
+    def close_section():
+        close_paragraph()
+        if paragraphs:
+            sections.append((" > ".join(path), "\n\n".join(paragraphs)))
+            paragraphs.clear()
+
+    for lines in pages:
+        for line in lines:
+            if is_furniture(line["text"], furniture):
+                continue
+
+            if _is_heading(line, body_size):
+                if path and _continues_title(line, last_heading):
+                    # Second line of a title that wrapped
+                    path[-1] += " " + line["text"]
+                else:
+                    close_section()
+                    lvl = level(line)
+                    path = path[:lvl - 1] + [line["text"]]
+                last_heading = line
+                last_block = None
+                continue
+
+            if line["block"] != last_block:
+                close_paragraph()
+                last_block = line["block"]
+            paragraph.append(line["text"])
+            last_heading = None
+
+        # Blocks are numbered per page
+        close_paragraph()
+        last_block = None
+        last_heading = None
+
+    close_section()
+
+    logger.info(f"Layout extraction: {len(sections)} sections, {len(headings)} heading lines (body font {body_size}pt)")
+    return sections
@@ -4,18 +4,51 @@
 
 # Third-Party Libraries
 import re
+import hashlib
 import logging
 
 # Logger setup to print info to console
 logger = logging.getLogger("uvicorn.error")
 
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+
+CUT_MIN_FILL = 0.6    # chunk_text: a chunk may end early at a content-defined cut point once it is this full...
+CUT_SPACING = 0.2     # ...and cut points come about every CUT_SPACING * max_tokens tokens of text
+EXACT_COUNT_FROM = 0.9  # Above this share of the budget, chunk sizes are checked on the joined text
+
+SECTION_MIN_FILL = 0.75  # chunk_sections: an open chunk below this share of the budget takes the next section too
+
 # ==========================================
-# 2. MAIN PROCESS
+# 2. HELPERS
 # ==========================================
 
-def chunk_text(text, tokenizer=None, max_tokens=256, overlap_tokens=30):
+def count_tokens(text, tokenizer=None):
+    """ Same counting rule as chunk_text: exact with a tokenizer, ~3 chars per token without. """
+    if tokenizer:
+        return len(tokenizer.encode(text, add_special_tokens=False))
+    return len(text) // 3
+
+
+def _is_cut_point(unit, unit_tokens, max_tokens):
+    """
+    Content-defined chunk boundary: decided by the unit's own (whitespace-normalized) text and size only.
+    Longer units are proportionally more likely to be cut points, so the spacing scales with the budget;
+    with cut points rarer than the drift an edit causes, both versions meet at the same one soon after it.
+    """
+    digest = hashlib.blake2b(" ".join(unit.split()).encode("utf-8"), digest_size=4).digest()
+    return int.from_bytes(digest, "big") / 2**32 < unit_tokens / (max_tokens * CUT_SPACING)
+
+# ==========================================
+# 3. MAIN PROCESS
+# ==========================================
+
+def chunk_text(text, tokenizer=None, max_tokens=256, overlap_tokens=30, with_counts=False, content_defined=True):
     """
     Splits text into chunks that fit the specific model's context window.
+    Boundaries fall between paragraphs or sentences and, with 'content_defined', partly depend on content (see E),
+    so a small edit only changes the chunks around it. That costs chunks: up to ~25% more (80-page report:
+    BART 89 -> 111, api 28 -> 36, T5 257 -> 268), so it is only worth it when the summary cache is on.
+    'with_counts' returns (chunks, token_counts), the counts the chunker already made (no re-tokenizing).
     """
     
     # ==========================================
@@ -47,21 +80,70 @@ def chunk_text(text, tokenizer=None, max_tokens=256, overlap_tokens=30):
     # ==========================================
     # B. PRE-SPLITTING
     # ==========================================
-    paragraphs = [p.strip() for p in re.split(r'\n\s*\n', text) if p.strip()]
-    
+    # Paragraphs, and the sentences of paragraphs over the budget (PyMuPDF often returns
+    # whole pages without a single blank line, which used to end up in fixed-size slices)
+    units = []
+    for para in (p.strip() for p in re.split(r'\n\s*\n', text)):
+        if not para:
+            continue
+        if get_token_count(para) <= max_tokens:
+            units.append(para)
+        else:
+            units.extend(s for s in _SENTENCE_END.split(para) if s.strip())
+
     chunks = []
+    counts = []  # Token count of every chunk (running sums, exact near the budget)
     current_chunk = []
     current_tokens = 0
+    has_new_text = False  # False while the accumulator only holds the overlap
+
+    def close_chunk():
+        """ Saves the accumulator as a finished chunk and starts the next one with the overlap. """
+        nonlocal current_chunk, current_tokens, has_new_text
+        if has_new_text:
+            chunks.append(" ".join(current_chunk))
+            counts.append(current_tokens)
+        has_new_text = False
+
+        if overlap_tokens > 0 and chunks:
+            previous_text = chunks[-1]
 
-    for para in paragraphs:
+            if tokenizer:
+                prev_ids = encode_text(previous_text)
+                # Grab the last N tokens
+                overlap_ids = prev_ids[-overlap_tokens:]
+                overlap_text = decode_tokens(overlap_ids)
+            else:
+                overlap_chars = overlap_tokens * 3
+                overlap_text = previous_text[-overlap_chars:]
+
+            # Start the new bucket containing the overlap
+            current_chunk = [overlap_text]
+            current_tokens = get_token_count(overlap_text)
+        else:
+            current_chunk = []
+            current_tokens = 0
+
+    def fits(para, para_tokens):
+        """ Running sums are cheap but ignore the joining spaces: near the limit, count the joined text. """
+        if current_tokens + para_tokens > max_tokens:
+            return False
+        if current_tokens + para_tokens < max_tokens * EXACT_COUNT_FROM:
+            return True
+        return get_token_count(" ".join(current_chunk + [para])) <= max_tokens
+
+    for para in units:
         para_tokens = get_token_count(para)
 
         # ==========================================
-        # C. HANDLING THE "GIANT PARAGRAPH"
+        # C. HANDLING THE "GIANT SENTENCE"
         # ==========================================
 
         if para_tokens > max_tokens:
-            
+            # Keep the document order: finish the open chunk before the slices
+            close_chunk()
+            current_chunk, current_tokens = [], 0
+
             # If tokenizer, slice by ID (very precise)
             if tokenizer:
                 sub_ids = encode_text(para)
@@ -69,6 +151,7 @@ def chunk_text(text, tokenizer=None, max_tokens=256, overlap_tokens=30):
                 for i in range(0, len(sub_ids), step):
                     chunk_ids = sub_ids[i : i + max_tokens]
                     chunks.append(decode_tokens(chunk_ids))
+                    counts.append(len(chunk_ids))
             
             # If don't, slice by characters (heuristic)
             else:
@@ -78,43 +161,125 @@ def chunk_text(text, tokenizer=None, max_tokens=256, overlap_tokens=30):
                 
                 for i in range(0, len(para), step):
                     chunks.append(para[i : i + char_limit])
+                    counts.append(get_token_count(chunks[-1]))
             
             continue
         
         # ==========================================
         # D. BUILDING THE CHUNK
         # ==========================================
-        if current_tokens + para_tokens > max_tokens:
-            
-            # A. Save the current accumulator as a finished chunk
-            if current_chunk:
-                chunks.append(" ".join(current_chunk))
-            
-            # B. Handle Overlap
-            if overlap_tokens > 0 and chunks:
-                previous_text = chunks[-1]
-                
-                if tokenizer:
-                    prev_ids = encode_text(previous_text)
-                    # Grab the last N tokens
-                    overlap_ids = prev_ids[-overlap_tokens:] 
-                    overlap_text = decode_tokens(overlap_ids)
-                else:
-                    overlap_chars = overlap_tokens * 3
-                    overlap_text = previous_text[-overlap_chars:]
-
-                # Start the new bucket containing the overlap
-                current_chunk = [overlap_text]
-                current_tokens = get_token_count(overlap_text)
-            else:
-                current_chunk = []
-                current_tokens = 0
+        if not fits(para, para_tokens):
+            close_chunk()
+
+            # The overlap never pushes a chunk over the budget
+            if not fits(para, para_tokens):
+                current_chunk, current_tokens = [], 0
         
         # Add the paragraph to the current bucket
         current_chunk.append(para)
         current_tokens += para_tokens
+        has_new_text = True
+
+        # E. CONTENT-DEFINED BOUNDARY: once the chunk is reasonably full, some units end it early.
+        # Which ones depends only on their own text, so after an edit the following chunks line up
+        # with the old ones again (and hit the summary cache) instead of all shifting by a few words.
+        if content_defined and current_tokens >= max_tokens * CUT_MIN_FILL and _is_cut_point(para, para_tokens, max_tokens):
+            close_chunk()
 
-    if current_chunk:
+    if has_new_text:
         chunks.append(" ".join(current_chunk))
+        counts.append(current_tokens)
+
+    return (chunks, counts) if with_counts else chunks
+
+
+def _section_units(text, tokenizer, max_tokens):
+    """ Sentences of a section (a sentence over the budget is sliced like a giant paragraph). """
+    units = []
+    for sentence in re.split(r'(?<=[.!?])\s+', text.strip()):
+        if count_tokens(sentence, tokenizer) <= max_tokens:
+            units.append(sentence)
+        else:
+            units.extend(chunk_text(sentence, tokenizer=tokenizer, max_tokens=max_tokens, overlap_tokens=0))
+    return units
+
+
+def section_prefix(title):
+    """ What chunk_sections puts before a section's text in a chunk ("" for untitled text). """
+    return f"{title}:" if title else ""
+
+
+def chunk_sections(sections, tokenizer=None, max_tokens=256, with_counts=False):
+    """
+    Packs (title, text) sections into chunks along the document structure.
+    A section starts a new chunk unless it fits in the open one (or the open one is less than
+    SECTION_MIN_FILL full); sections over the budget are cut between sentences.
+    Every chunk, and every section starting inside one, is preceded by its title path
+    (section_prefix), so the model sees the headings; the prefixes count against the budget.
+    Since every chunk starts at a section or sentence boundary, no overlap is needed.
+    Returns (chunks, titles): the section titles of every chunk (untitled text has none);
+    with 'with_counts' also their token counts.
+    """
+    chunks, titles, counts = [], [], []
+    current, current_titles, current_tokens = [], [], 0
+    last_title = None  # Title of the last unit in the open chunk
+
+    def flush():
+        nonlocal current_tokens, last_title
+        if current:
+            chunks.append(" ".join(current))
+            titles.append(list(current_titles))
+            counts.append(current_tokens)
+        current.clear()
+        current_titles.clear()
+        current_tokens = 0
+        last_title = None
+
+    def pieces(unit, title, tokens):
+        """ The unit (preceded by its title when it opens the chunk or a new section in it) and their tokens. """
+        prefix = section_prefix(title)
+        if prefix and title != last_title:
+            return [prefix, unit], tokens + count_tokens(prefix, tokenizer)
+        return [unit], tokens
+
+    def fits(units, tokens):
+        """ Running sums ignore the joining spaces: near the limit, count the joined text. """
+        if current_tokens + tokens > max_tokens:
+            return False
+        if current_tokens + tokens < max_tokens * EXACT_COUNT_FROM:
+            return True
+        return count_tokens(" ".join(current + units), tokenizer) <= max_tokens
+
+    def add(units, title, tokens):
+        nonlocal current_tokens, last_title
+        current.extend(units)
+        if title and title not in current_titles:
+            current_titles.append(title)
+        current_tokens += tokens
+        last_title = title
+
+    for title, text in sections:
+        units, tokens = pieces(text, title, count_tokens(text, tokenizer))
+
+        # A. SECTION BOUNDARY: a section that doesn't fit in the open chunk starts a new one,
+        # unless the open chunk is still mostly empty (then the section continues it)
+        if not fits(units, tokens) and current_tokens >= max_tokens * SECTION_MIN_FILL:
+            flush()
+            units, tokens = pieces(text, title, count_tokens(text, tokenizer))
+
+        # B. FILL: the whole section if it fits, otherwise sentence by sentence (never cut mid-sentence)
+        if fits(units, tokens):
+            add(units, title, tokens)
+            continue
+
+        # Room left for a sentence in a chunk of its own, next to the title (and a joining space)
+        prefix_tokens = count_tokens(section_prefix(title), tokenizer) + 1 if title else 0
+        for sentence in _section_units(text, tokenizer, max(max_tokens // 2, max_tokens - prefix_tokens)):
+            units, tokens = pieces(sentence, title, count_tokens(sentence, tokenizer))
+            if not fits(units, tokens):
+                flush()
+                units, tokens = pieces(sentence, title, count_tokens(sentence, tokenizer))
+            add(units, title, tokens)
 
-    return chunks
\ No newline at end of file
+    flush()
+    return (chunks, titles, counts) if with_counts else (chunks, titles)
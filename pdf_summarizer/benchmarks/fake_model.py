@@ -0,0 +1,76 @@
+# ==========================================
+# 1. IMPORTS & SETUP
+# ==========================================
+# Stand-ins for a T5 tokenizer/model with the same call signatures the pipeline uses.
+# "Generation" just echoes the first input tokens, so a run measures pure pipeline
+# overhead (extraction, chunking, dedup, cache, streaming) with no neural compute.
+
+
+class FakeTensor(list):
+    """ A list of token-id rows that tolerates .to(device) like a torch tensor. """
+
+    def to(self, device):
+        return self
+
+
+class FakeBatch(dict):
+    def to(self, device):
+        return self
+
+# ==========================================
+# 2. TOKENIZER
+# ==========================================
+class FakeTokenizer:
+    """ Whitespace tokenizer with a growing vocabulary (one id per distinct word). """
+
+    def __init__(self):
+        self._ids = {}
+        self._words = []
+
+    def _id(self, word):
+        if word not in self._ids:
+            self._ids[word] = len(self._words)
+            self._words.append(word)
+        return self._ids[word]
+
+    def _encode(self, text, max_length=None, truncation=False):
+        ids = [self._id(w) for w in text.split()]
+        if truncation and max_length:
+            ids = ids[:max_length]
+        return ids
+
+    def encode(self, text, add_special_tokens=True, return_tensors=None, max_length=None, truncation=False):
+        ids = self._encode(text, max_length, truncation)
+        return FakeTensor([ids]) if return_tensors else ids
+
+    def __call__(self, texts, return_tensors=None, padding=False, max_length=None, truncation=False):
+        rows = [self._encode(t, max_length, truncation) for t in ([texts] if isinstance(texts, str) else texts)]
+        masks = [[1] * len(r) for r in rows]
+        return FakeBatch(input_ids=FakeTensor(rows), attention_mask=FakeTensor(masks))
+
+    def decode(self, ids, skip_special_tokens=False):
+        return " ".join(self._words[i] for i in ids)
+
+    def batch_decode(self, rows, skip_special_tokens=False):
+        return [self.decode(r) for r in rows]
+
+# ==========================================
+# 3. MODEL
+# ==========================================
+class FakeSeq2Seq:
+    """ Echoes up to 'max_length' input tokens. Feeds a streamer word by word if one is given. """
+
+    def __init__(self, tokenizer):
+        self.tokenizer = tokenizer
+
+    def to(self, device):
+        return self
+
+    def generate(self, input_ids, max_length=300, min_length=0, streamer=None, **kwargs):
+        rows = FakeTensor(row[:max(1, max_length)] for row in input_ids)
+
+        if streamer is not None:
+            for token_id in rows[0]:
+                streamer.on_finalized_text(self.tokenizer.decode([token_id]) + " ")
+
+        return rows
@@ -0,0 +1,154 @@
+"""
+Map-step throughput of the Mistral GGUF runtime: prompt-eval and generation tokens/s of the
+previous map call (model(prompt) on the whole prompt string) against the current one
+(shared, pre-tokenized instruction prefix + the chunk's tokens).
+
+Usage (from the pdf_summarizer folder, needs the GGUF file, see MISTRAL_MODEL_PATH):
+    MISTRAL_PROFILE=cpu python -m benchmarks.mistral_runtime --chunks 6
+    MISTRAL_PROFILE=cpu MISTRAL_THREADS=8 MISTRAL_BATCH_SIZE=512 python -m benchmarks.mistral_runtime --out cpu8.json
+"""
+
+# ==========================================
+# 1. IMPORTS & SETUP
+# ==========================================
+import os
+import json
+import time
+import argparse
+import warnings
+
+from benchmarks.synthetic_pdf import make_pdf
+
+# ==========================================
+# 2. MEASUREMENT
+# ==========================================
+
+def _previous_prompt(chunk):
+    """ The map prompt as a single string, as summarize_mistral built it before the shared prefix. """
+    return (
+        f"[INST] Analyze the text below and extract the key information. "
+        f"Focus on capturing main ideas. Output a concise list of bullet points. "
+        f"Text: {chunk} [/INST]\nKey Points:"
+    )
+
+
+def _timed(model, tokens, outputs, max_new_tokens):
+    """
+    Consumes one generation and splits its time at the first output:
+    before it is prompt evaluation, after it is generation.
+    'tokens' is the prompt as the runtime sees it (only the part that differs from its context is evaluated).
+    """
+    evaluated = len(model.prepare_inputs_for_generation(list(tokens)))
+    started = time.perf_counter()
+    first_token_at = None
+    generated = 0
+
+    for _ in outputs:
+        if first_token_at is None:
+            first_token_at = time.perf_counter()
+        generated += 1
+        if generated >= max_new_tokens:
+            break
+
+    ended = time.perf_counter()
+    first_token_at = first_token_at or ended
+    return {
+        "prompt_tokens": len(tokens),
+        "prompt_tokens_evaluated": evaluated,
+        "prompt_eval_s": first_token_at - started,
+        "generated_tokens": generated,
+        "generation_s": ended - first_token_at,
+    }
+
+
+def _run_previous(model, chunk, max_new_tokens):
+    """ The previous map call: model(prompt) with the whole prompt string (streamed, to see the first token). """
+    prompt = _previous_prompt(chunk)
+    outputs = model(prompt, max_new_tokens=max_new_tokens, temperature=0.1, repetition_penalty=1.15, stream=True)
+    return _timed(model, model.tokenize(prompt), outputs, max_new_tokens)
+
+
+def _run_current(model, prefix_ids, chunk, max_new_tokens):
+    """ The current map call: same loop as mistral_generate, on the shared prefix + chunk tokens. """
+    from app.services.summarizers import mistral_map_tokens
+
+    tokens = mistral_map_tokens(model, prefix_ids, chunk)
+    outputs = model.generate(tokens, temperature=0.1, repetition_penalty=1.15)
+    return _timed(model, tokens, outputs, max_new_tokens)
+
+
+def _summarize(rows):
+    prompt_tokens = sum(r["prompt_tokens_evaluated"] for r in rows)
+    prompt_s = sum(r["prompt_eval_s"] for r in rows) or 1e-9
+    gen_tokens = sum(r["generated_tokens"] for r in rows)
+    gen_s = sum(r["generation_s"] for r in rows) or 1e-9
+    return {
+        "chunks": len(rows),
+        "prompt_tokens_total": sum(r["prompt_tokens"] for r in rows),
+        "prompt_tokens_evaluated": prompt_tokens,
+        "prompt_eval_tokens_per_s": round(prompt_tokens / prompt_s, 2),
+        "generation_tokens_per_s": round(gen_tokens / gen_s, 2),
+        "map_wall_s": round(prompt_s + gen_s, 2),
+    }
+
+# ==========================================
+# 3. ENTRY POINT
+# ==========================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Mistral map-step prompt-eval/generation benchmark.")
+    parser.add_argument("--chunks", type=int, default=6)
+    parser.add_argument("--max-new-tokens", type=int, default=64)
+    parser.add_argument("--out", default="benchmark_report_mistral.json")
+    args = parser.parse_args()
+
+    from app.config import MISTRAL_MODEL_PATH, CHUNK_PROFILES
+    from app.services.model_loader import get_model_and_tokenizer, mistral_runtime
+    from app.services.summarizer import extract_text, prepare_chunks
+    from app.services.summarizers import MISTRAL_MAP_PREFIX
+
+    if not os.path.exists(MISTRAL_MODEL_PATH):
+        print(f"Skipped: {MISTRAL_MODEL_PATH} not found (set MISTRAL_MODEL_PATH).")
+        return
+
+    # Realistic map input: chunks of a synthetic report, cut with the Mistral chunk profile
+    pdf_path = make_pdf("benchmark_mistral.pdf", pages=max(2, args.chunks))
+    try:
+        chunks, _, _ = prepare_chunks(extract_text(pdf_path), "mistral", None)
+    finally:
+        os.remove(pdf_path)
+    chunks = [c.replace("\n", " ").strip() for c in chunks[:args.chunks]]
+
+    started = time.perf_counter()
+    _, model = get_model_and_tokenizer("mistral")
+    load_s = time.perf_counter() - started
+
+    prefix_ids = model.tokenize(MISTRAL_MAP_PREFIX)
+
+    profile, runtime = mistral_runtime()
+    report = {
+        "profile": profile,
+        "runtime": runtime,
+        "chunk_max_tokens": CHUNK_PROFILES["mistral"]["max_tokens"],
+        "prefix_tokens": len(prefix_ids),
+        "model_load_s": round(load_s, 2),
+    }
+    modes = {
+        "previous_string_prompt": lambda chunk: _run_previous(model, chunk, args.max_new_tokens),
+        "shared_prefix_tokens": lambda chunk: _run_current(model, prefix_ids, chunk, args.max_new_tokens),
+    }
+    for mode, run in modes.items():
+        # Both modes start from an empty context, then keep it between chunks like the app does
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            model.reset()
+        report[mode] = _summarize([run(chunk) for chunk in chunks])
+        print(mode, json.dumps(report[mode]))
+
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nReport written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""
+Offline, CPU-only benchmark of the extract -> chunk -> map -> reduce pipeline.
+
+Usage (from the pdf_summarizer folder):
+    python -m benchmarks.run_benchmark                       # fake + tiny backends, default sizes
+    python -m benchmarks.run_benchmark --pages 5 50 --backends fake
+    python -m benchmarks.run_benchmark --out after.json --compare before.json
+    python -m benchmarks.run_benchmark --structured --out structured.json --compare plain.json
+
+Backends:
+    fake  -> FakeSeq2Seq (benchmarks/fake_model.py): pure pipeline overhead, no neural compute.
+    tiny  -> a tiny T5 checkpoint from the local Hugging Face cache (--tiny-model), run through
+             the real T5 code path. Skipped (not failed) if the checkpoint isn't cached.
+
+--structured: the synthetic PDFs get section headings and both runs use layout-aware,
+section-following chunking (compare against a plain run of the same sizes).
+"""
+
+# ==========================================
+# 1. IMPORTS & SETUP
+# ==========================================
+import os
+
+# Must happen before any app import: no network, no persistent cache skewing the numbers, CPU only
+os.environ.setdefault("HF_HUB_OFFLINE", "1")
+os.environ.setdefault("TRANSFORMERS_OFFLINE", "1")
+os.environ.setdefault("SUMMARY_CACHE_ENABLED", "0")
+os.environ.setdefault("CUDA_VISIBLE_DEVICES", "")
+os.environ.setdefault("DEVICE", "cpu")  # Skips torch's device probe, so the fake backend never imports torch
+
+import sys
+import json
+import time
+import asyncio
+import argparse
+import platform
+import resource
+import tempfile
+import subprocess
+import multiprocessing
+
+DEFAULT_TINY_MODEL = "hf-internal-testing/tiny-random-T5ForConditionalGeneration"
+
+# ==========================================
+# 2. ONE CASE (runs in a fresh process)
+# ==========================================
+
+def _load_backend(backend, tiny_model):
+    if backend == "fake":
+        from benchmarks.fake_model import FakeTokenizer, FakeSeq2Seq
+        tok = FakeTokenizer()
+        return tok, FakeSeq2Seq(tok)
+
+    from transformers import AutoTokenizer, T5ForConditionalGeneration
+    tok = AutoTokenizer.from_pretrained(tiny_model, local_files_only=True)
+    mdl = T5ForConditionalGeneration.from_pretrained(tiny_model, local_files_only=True)
+    return tok, mdl
+
+
+async def _measure(backend, pages, tiny_model, workdir, structured=False):
+    from benchmarks.synthetic_pdf import make_pdf
+    from app.services import model_loader
+    from app.services.summarizer import extract_text, extract_sections, prepare_chunks, prepare_section_chunks, summarize_text
+    from app.services.summarizers import summarize_t5, finalize_t5
+
+    pdf_path = make_pdf(os.path.join(workdir, f"synthetic_{pages}p.pdf"), pages, headings=structured)
+    stages = {}
+
+    # A. MODEL LOAD (registered in the loader's memo cache, so summarize_text picks it up as "t5-small")
+    t = time.perf_counter()
+    tok, mdl = _load_backend(backend, tiny_model)
+    stages["model_load_s"] = time.perf_counter() - t
+    model_loader._loaded["t5-small"] = (tok, mdl)
+
+    # B. STAGE BY STAGE
+    t = time.perf_counter()
+    source = extract_sections(pdf_path) if structured else extract_text(pdf_path)
+    stages["extract_s"] = time.perf_counter() - t
+
+    t = time.perf_counter()
+    if structured:
+        chunks, skipped, _, _ = prepare_section_chunks(source, "t5-small", tok)
+    else:
+        chunks, skipped, _ = prepare_chunks(source, "t5-small", tok)
+    stages["chunk_s"] = time.perf_counter() - t
+
+    t = time.perf_counter()
+    summaries = [s async for _, s in summarize_t5(tok, mdl, chunks)]
+    stages["map_s"] = time.perf_counter() - t
+
+    t = time.perf_counter()
+    await finalize_t5(tok, mdl, "\n\n".join(summaries))
+    stages["reduce_s"] = time.perf_counter() - t
+
+    tokens_in = sum(len(tok.encode(c, add_special_tokens=False)) for c in chunks)
+    tokens_out = sum(len(tok.encode(s, add_special_tokens=False)) for s in summaries)
+
+    # C. END TO END (what a client of /upload experiences)
+    t = time.perf_counter()
+    first_progress = None
+    async for msg in summarize_text(pdf_path, "t5-small", structured=structured):
+        if first_progress is None and msg.startswith("PROGRESS:"):
+            first_progress = time.perf_counter() - t
+    e2e = time.perf_counter() - t
+
+    map_s = stages["map_s"] or 1e-9
+    return {
+        "backend": backend,
+        "pages": pages,
+        "structured": structured,
+        "pdf_mb": round(os.path.getsize(pdf_path) / 1024 / 1024, 3),
+        "chunks": len(chunks),
+        "skipped_duplicates": skipped,
+        "stages": {k: round(v, 4) for k, v in stages.items()},
+        "map_tokens_in_per_s": round(tokens_in / map_s, 1),
+        "map_tokens_out_per_s": round(tokens_out / map_s, 1),
+        "e2e_s": round(e2e, 4),
+        "time_to_first_progress_s": round(first_progress, 4) if first_progress is not None else None,
+        # Linux reports ru_maxrss in KB (macOS in bytes)
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+                             / (1024 * 1024 if sys.platform == "darwin" else 1024), 1),
+    }
+
+
+def _run_case(backend, pages, tiny_model, structured, results):
+    with tempfile.TemporaryDirectory() as workdir:
+        try:
+            results.put(asyncio.run(_measure(backend, pages, tiny_model, workdir, structured)))
+        except (OSError, ImportError) as e:
+            # Typically: tiny checkpoint not in the local cache, or transformers missing
+            results.put({"backend": backend, "pages": pages, "skipped": str(e)})
+        except Exception as e:
+            # Any other failure is a result of this case, not a reason to lose the rest of the run
+            results.put({"backend": backend, "pages": pages, "failed": f"{type(e).__name__}: {e}"})
+        finally:
+            # Like the app's shutdown: this process can't exit while the extraction processes wait for work
+            from app.services.summarizer import shutdown_extraction
+            shutdown_extraction()
+
+# ==========================================
+# 3. REPORTING
+# ==========================================
+
+def _git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _measured(case):
+    return "skipped" not in case and "failed" not in case
+
+
+def compare(old_report, new_report):
+    """ Prints the relative change of the headline numbers for cases present in both reports. """
+    old = {(c["backend"], c["pages"]): c for c in old_report["cases"] if _measured(c)}
+
+    print(f"\nComparing {old_report.get('commit')} -> {new_report.get('commit')}")
+    for case in new_report["cases"]:
+        before = old.get((case["backend"], case["pages"]))
+        if before is None or not _measured(case):
+            continue
+
+        parts = []
+        for key in ("e2e_s", "time_to_first_progress_s", "peak_rss_mb"):
+            a, b = before.get(key), case.get(key)
+            if a and b is not None:
+                parts.append(f"{key} {a} -> {b} ({(b - a) / a:+.1%})")
+        print(f"  {case['backend']:>5} {case['pages']:>4}p: " + ", ".join(parts))
+
+# ==========================================
+# 4. ENTRY POINT
+# ==========================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmark of the PDF summarization pipeline.")
+    parser.add_argument("--pages", type=int, nargs="+", default=[5, 20, 80])
+    parser.add_argument("--backends", nargs="+", choices=["fake", "tiny"], default=["fake", "tiny"])
+    parser.add_argument("--tiny-model", default=DEFAULT_TINY_MODEL)
+    parser.add_argument("--structured", action="store_true", help="Sectioned PDFs, layout-aware chunking")
+    parser.add_argument("--out", default="benchmark_report.json")
+    parser.add_argument("--compare", help="Earlier report to diff against")
+    args = parser.parse_args()
+
+    # Each case gets a fresh process so peak RSS and model caches don't leak between cases
+    ctx = multiprocessing.get_context("spawn")
+    cases = []
+    for backend in args.backends:
+        for pages in args.pages:
+            results = ctx.Queue()
+            proc = ctx.Process(target=_run_case, args=(backend, pages, args.tiny_model, args.structured, results))
+            proc.start()
+            proc.join()
+
+            case = results.get() if not results.empty() else {
+                "backend": backend, "pages": pages, "skipped": f"process exited with code {proc.exitcode}"
+            }
+            cases.append(case)
+            print(json.dumps(case))
+
+    report = {
+        "commit": _git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "cases": cases,
+    }
+
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nReport written to {args.out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# ==========================================
+# 1. IMPORTS & SETUP
+# ==========================================
+
+# Third-Party Libraries
+import random
+import fitz  # PyMuPDF
+
+# A small business-report vocabulary, so the text looks like prose to the sentence splitter and the tokenizers
+_WORDS = (
+    "revenue margin quarter growth customer contract supplier risk audit compliance "
+    "forecast budget capital investment market share product launch region team "
+    "increase decrease stable significant operating annual report board review "
+    "policy agreement payment delivery schedule milestone performance target cost"
+).split()
+
+# ==========================================
+# 2. MAIN PROCESS
+# ==========================================
+
+def _sentence(rng):
+    words = [rng.choice(_WORDS) for _ in range(rng.randint(8, 20))]
+    return " ".join(words).capitalize() + "."
+
+
+PARAGRAPH_GAP = 10  # Points between two paragraph boxes
+
+
+def _write_paragraphs(page, paragraphs, y):
+    """ One text box per paragraph with a gap after each, so every paragraph is its own block. Returns the new y. """
+    for paragraph in paragraphs:
+        box = fitz.Rect(72, y, 540, 780)
+        # insert_textbox returns the unused height of the box
+        y += box.height - page.insert_textbox(box, paragraph, fontsize=9) + PARAGRAPH_GAP
+    return y
+
+
+def _text_blocks(page):
+    return [b for b in page.get_text("blocks") if b[6] == 0 and b[4].strip()]
+
+
+def make_pdf(path, pages, seed=0, paragraphs_per_page=4, headings=False):
+    """
+    Writes a deterministic synthetic report of 'pages' pages to 'path'.
+    Every page has a repeated header and a numbered footer (like real reports),
+    and a few paragraphs of generated prose, each in its own text block.
+    With 'headings', every page opens a numbered section (14pt) and its
+    paragraphs alternate between two subsections (11pt), for layout-aware extraction.
+    """
+    rng = random.Random(seed)
+    doc = fitz.open()
+    lines_per_page = 2 + (3 if headings else 0)  # Header, footer (and heading lines) are blocks too
+
+    for page_no in range(1, pages + 1):
+        page = doc.new_page()
+        page.insert_text((72, 40), "ACME Corp - Annual Report - Confidential", fontsize=8)
+
+        paragraphs = []
+        for _ in range(paragraphs_per_page):
+            paragraphs.append(" ".join(_sentence(rng) for _ in range(rng.randint(3, 6))))
+
+        if headings:
+            y = 72
+            page.insert_text((72, y), f"{page_no} {rng.choice(_WORDS).capitalize()} {rng.choice(_WORDS)}", fontsize=14)
+            half = (len(paragraphs) + 1) // 2
+            for sub, group in enumerate((paragraphs[:half], paragraphs[half:]), start=1):
+                y += 26
+                page.insert_text((72, y), f"{page_no}.{sub} {rng.choice(_WORDS).capitalize()}", fontsize=11)
+                y = _write_paragraphs(page, group, y + 8)
+        else:
+            _write_paragraphs(page, paragraphs, 60)
+
+        page.insert_text((280, 800), f"Page {page_no} of {pages}", fontsize=8)
+
+        # The benchmarks rely on real paragraphs; a box that overflowed the page would silently lose them
+        blocks = len(_text_blocks(page))
+        assert blocks == paragraphs_per_page + lines_per_page, f"page {page_no}: {blocks} text blocks"
+
+    doc.save(path)
+    doc.close()
+    return path
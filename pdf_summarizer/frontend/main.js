@@ -86,6 +86,8 @@ document.addEventListener("DOMContentLoaded", () => {
      ========================================================================== */
   const uploadBtn = document.getElementById("uploadBtn");
   const modelSelect = document.getElementById("model");
+  const prefilterBox = document.getElementById("prefilter");
+  const structuredBox = document.getElementById("structured");
 
   const outputDiv = document.getElementById("output");
   const progressContainer = document.getElementById("progress-container");
@@ -123,6 +125,7 @@ document.addEventListener("DOMContentLoaded", () => {
 
     // 1. Reset UI for new request
     outputDiv.textContent = "";
+    delete outputDiv.dataset.streaming;
     progressBar.style.width = "0%";
     progressContainer.style.display = "block";
     timeEstimate.textContent = "Starting...";
@@ -131,6 +134,11 @@ document.addEventListener("DOMContentLoaded", () => {
     const formData = new FormData();
     formData.append("file", file);
     formData.append("model_choice", modelChoice);
+    formData.append("prefilter", prefilterBox.checked);
+    formData.append("structured", structuredBox.checked);
+    // Streamed drafts of the final summary: Mistral/API stream at no cost, but T5/BART would give up
+    // beam search for them (greedy decoding), so those wait for the beam-searched SUMMARY instead
+    formData.append("partials", modelChoice === "mistral" || modelChoice === "api");
 
     // 3. Initiate Stream Request (This section calls backend, namely routes/upload.py)
     const response = await fetch("http://127.0.0.1:8000/upload", {
@@ -181,11 +189,26 @@ document.addEventListener("DOMContentLoaded", () => {
                   timeEstimate.textContent = `Estimated time remaining: ${minutes}:${seconds.toString().padStart(2, '0')}`;
               }
           }
+          else if (line.startsWith("DEDUP:")) {
+              const [skipped, total] = line.replace("DEDUP:", "").split("/").map(Number);
+              timeEstimate.textContent = `Skipped ${skipped} of ${total} duplicate chunks.`;
+          }
+          else if (line.startsWith("PARTIAL:")) {
+            // Final summary arriving token by token: show it as it is written
+            if (!outputDiv.dataset.streaming) {
+              outputDiv.textContent = "";
+              outputDiv.dataset.streaming = "true";
+              progressBar.style.width = "100%";
+              timeEstimate.textContent = "Writing final summary...";
+            }
+            outputDiv.textContent += line.slice(8).replace(/\\n/g, "\n");
+          }
           else if (line.startsWith("SUMMARY:")) {
             const rawText = line.slice(8);
             const formattedText = rawText.replace(/\\n/g, "\n");
 
-            outputDiv.textContent = formattedText;
+            outputDiv.textContent = formattedText; // Replaces the streamed draft with the cleaned-up result
+            delete outputDiv.dataset.streaming;
             progressBar.style.width = "100%";
             timeEstimate.textContent = "Completed!";
           }
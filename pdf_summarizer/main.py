@@ -3,20 +3,47 @@
 # ==========================================
 
 # Third-Party Libraries
+import time
+import logging
+from contextlib import asynccontextmanager
+_import_started = time.perf_counter()
+
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
 # Local Modules
 from app.routes import upload  # This contains the PDF processing logic
+from app.routes import jobs    # Queued/background version of the same pipeline
+from app.routes import batch   # Many PDFs (or a zip) in one NDJSON stream
+from app.services import metrics
+from app.services import backends  # Model libraries are imported per backend on first use
+from app.services.summarizer import shutdown_extraction
+from app.utils.file_utils import BodyLimitMiddleware
+from app.config import MAX_UPLOAD_MB, BATCH_MAX_MB
+
+# Logger setup to print info to console
+logger = logging.getLogger("uvicorn.error")
 
 # ==========================================
 # 2. APP INITIALIZATION
 # ==========================================
+
+# Startup report: how long the app took to import, and which backends are loaded
+# (only those in PRELOAD_BACKENDS; everything else is imported on first use)
+@asynccontextmanager
+async def lifespan(app):
+    logger.info(f"App modules imported in {time.perf_counter() - _import_started:.2f}s")
+    backends.startup_report()
+    yield
+    shutdown_extraction()
+
 app = FastAPI(
     title="PDF Summarizer",
     description="A backend API that processes PDFs and streams summaries back to the client.",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # ==========================================
@@ -30,12 +57,25 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Oversized uploads get a 413 before Starlette spools their multipart body to disk
+app.add_middleware(
+    BodyLimitMiddleware,
+    limits={"/upload": MAX_UPLOAD_MB, "/jobs": MAX_UPLOAD_MB, "/batch": BATCH_MAX_MB},
+)
+
 # ==========================================
 # 4. API ROUTES
 # ==========================================
 # This connects "http://localhost:8000/upload" to the logic in upload.py.
 
 app.include_router(upload.router)
+app.include_router(jobs.router)
+app.include_router(batch.router)
+
+# Prometheus-style counters and histograms for every pipeline stage (see services/metrics.py)
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    return metrics.render()
 
 # ==========================================
 # 5. FRONTEND SERVING
@@ -0,0 +1,5 @@
+# Makes the "app" package importable when pytest is run from the pdf_summarizer folder or the tests folder
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
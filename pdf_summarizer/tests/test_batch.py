@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+
+from app.services import batch, metrics
+
+
+async def _inline_extraction(extract, path):
+    # The lambdas above can't be sent to the extraction processes
+    return extract(path)
+
+
+@pytest.fixture
+def fake_backend(monkeypatch):
+    calls = []
+
+    def mapper(tokenizer, model, chunks):
+        calls.append(list(chunks))
+        if any(c.startswith("bad") for c in chunks):
+            raise RuntimeError("out of memory")
+        return [c.upper() for c in chunks]
+
+    async def reduce(model_choice, tokenizer, model, summaries):
+        return " ".join(summaries)
+
+    texts = {"bad.pdf": [f"bad {i}" for i in range(5)], "good.pdf": ["good 0"]}
+
+    monkeypatch.setattr(batch, "BATCH_SIZE", 2)
+    monkeypatch.setattr(batch, "BATCHED_MAPPERS", {"t5-small": mapper})
+    monkeypatch.setattr(batch, "get_model_and_tokenizer", lambda name: (None, None))
+    monkeypatch.setattr(batch, "extract_text", lambda path: path)
+    monkeypatch.setattr(batch, "run_extraction", _inline_extraction)
+    monkeypatch.setattr(batch, "prepare_chunks", lambda text, *args: (texts[text], 0, len(texts[text])))
+    monkeypatch.setattr(batch, "_reduce", reduce)
+    return calls
+
+
+def _run(documents, model_choice="t5-small"):
+    async def collect():
+        return [event async for event in batch.summarize_batch(documents, model_choice)]
+    return asyncio.run(collect())
+
+
+def test_failed_document_chunks_are_dropped_from_the_queue(fake_backend):
+    events = _run([("bad.pdf", "bad.pdf"), ("good.pdf", "good.pdf")])
+
+    # One failing batch for bad.pdf, then only good.pdf's chunk: bad 2..4 never reach the model
+    assert fake_backend == [["bad 0", "bad 1"], ["good 0"]]
+    assert {"type": "error", "doc": "bad.pdf", "message": "out of memory"} in events
+    assert {"type": "summary", "doc": "good.pdf", "summary": "GOOD 0"} in events
+    assert events[-1]["type"] == "done"
+
+
+def test_batch_records_metrics(fake_backend):
+    def stage_count(stage):
+        hist = metrics._histograms.get(("pdfsum_stage_seconds", (("model", "t5-small"), ("stage", stage))))
+        return hist["count"] if hist else 0
+
+    def counter(name):
+        return metrics._counters.get((name, (("model", "t5-small"),)), 0)
+
+    before = {s: stage_count(s) for s in ("extract", "chunk", "map_batch", "reduce", "total")}
+    documents, tokens_in = counter("pdfsum_documents_total"), counter("pdfsum_tokens_in_total")
+
+    _run([("good.pdf", "good.pdf")])
+
+    assert {s: stage_count(s) - n for s, n in before.items()} == {
+        "extract": 1, "chunk": 1, "map_batch": 1, "reduce": 1, "total": 1
+    }
+    assert counter("pdfsum_documents_total") == documents + 1
+    assert counter("pdfsum_tokens_in_total") == tokens_in + 1
+
+
+def test_sequential_map_failure_only_fails_that_document(fake_backend, monkeypatch):
+    async def flaky_api(chunks, trace=None):
+        for idx, chunk in enumerate(chunks, start=1):
+            if chunk.startswith("bad"):
+                raise RuntimeError("rate limited")
+            yield idx, chunk.upper()
+
+    monkeypatch.setattr(batch, "summarize_api", flaky_api)
+    events = _run([("bad.pdf", "bad.pdf"), ("good.pdf", "good.pdf")], "api")
+
+    assert {"type": "error", "doc": "bad.pdf", "message": "rate limited"} in events
+    assert {"type": "summary", "doc": "good.pdf", "summary": "GOOD 0"} in events
+    assert events[-1]["type"] == "done"
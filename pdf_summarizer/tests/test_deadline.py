@@ -0,0 +1,69 @@
+import pytest
+
+from app.services import deadline
+from app.services.deadline import DeadlinePlanner, LEVELS
+
+T5_LIKE = {"max_length": 300, "min_length": 100, "num_beams": 4, "early_stopping": True}
+MISTRAL_LIKE = {"max_new_tokens": 200, "temperature": 0.1, "repetition_penalty": 1.15}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(deadline.time, "monotonic", lambda: now[0])
+    return now
+
+
+def _level(planner):
+    return LEVELS[planner.level]["name"]
+
+
+def test_first_apply_reports_the_starting_settings(clock):
+    planner = DeadlinePlanner(60)
+    planner.start(10)
+    assert planner.pop_report() is None  # Nothing applied yet
+
+    planner.apply(T5_LIKE)
+    assert planner.pop_report() == "level=full,num_beams=4,min_length=100,max_length=300,budget=60s"
+    planner.apply(T5_LIKE)
+    assert planner.pop_report() is None
+
+
+def test_report_only_lists_parameters_the_backend_uses(clock):
+    planner = DeadlinePlanner(60)
+    planner.start(10)
+    planner.apply(MISTRAL_LIKE)
+    assert planner.pop_report() == "level=full,max_new_tokens=200,budget=60s"
+
+
+def test_slow_chunks_step_down_and_fast_ones_step_back_up(clock):
+    planner = DeadlinePlanner(60)
+    planner.start(10)
+    planner.apply(T5_LIKE)
+    planner.pop_report()
+
+    # 20s per chunk at full quality, 12 chunk-equivalents left in 40s: not even the cheapest level fits
+    clock[0] += 20
+    planner.record(20)
+    assert _level(planner) == "minimal"
+
+    params = planner.apply(T5_LIKE)
+    assert params["num_beams"] == 1 and "early_stopping" not in params
+    assert params["min_length"] == 30
+    assert planner.pop_report().startswith("level=minimal,num_beams=1,")
+
+    # Chunks get much faster: the planner climbs back to full quality
+    for _ in range(3):
+        planner.record(0.01)
+    assert _level(planner) == "full"
+    assert planner.apply(T5_LIKE) == T5_LIKE
+
+
+def test_lengths_never_collapse(clock):
+    planner = DeadlinePlanner(1)
+    planner.start(100)
+    planner.record(5)
+
+    params = planner.apply({"max_length": 20, "min_length": 15, "max_new_tokens": 50})
+    assert params["max_length"] >= params["min_length"] + 10
+    assert params["max_new_tokens"] == 32
@@ -0,0 +1,48 @@
+from app.utils.dedup import simhash, drop_near_duplicates, strip_page_furniture, find_furniture
+
+PARAGRAPH = (
+    "The supplier agreement was renewed for three years with a fixed price and a quarterly "
+    "review of delivery performance, including penalties for late shipments."
+)
+
+
+def _page(n, body):
+    return f"ACME Corp Annual Report\n{body}\nPage {n} of 5\n"
+
+
+def test_strip_page_furniture_removes_headers_and_page_numbers():
+    pages = [_page(n, f"Body text number {n} talks about a different topic entirely.") for n in range(1, 6)]
+    cleaned, removed = strip_page_furniture(pages)
+
+    assert removed == 10
+    assert all("ACME" not in p and "Page" not in p for p in cleaned)
+    assert "Body text number 3" in cleaned[2]
+
+
+def test_numbered_content_lines_are_not_furniture():
+    # Long lines keep their digits, so "Clause 1 ..." and "Clause 2 ..." stay distinct
+    pages = [f"Clause {n} of the contract sets the payment schedule for the year.\n" for n in range(1, 6)]
+    assert find_furniture([p.splitlines() for p in pages]) == set()
+
+
+def test_short_documents_are_left_alone():
+    pages = [_page(1, "One."), _page(2, "Two.")]
+    assert strip_page_furniture(pages) == (pages, 0)
+
+
+def test_simhash_is_close_for_near_duplicates_and_far_otherwise():
+    edited = PARAGRAPH.replace("three years", "3 years")
+    other = "Revenue grew in every region after the product launch, driven by new enterprise customers."
+
+    assert bin(simhash(PARAGRAPH) ^ simhash(PARAGRAPH)).count("1") == 0
+    assert bin(simhash(PARAGRAPH) ^ simhash(edited)).count("1") < bin(simhash(PARAGRAPH) ^ simhash(other)).count("1")
+
+
+def test_drop_near_duplicates_keeps_first_occurrence():
+    other = "Revenue grew in every region after the product launch, driven by new enterprise customers."
+    chunks = [PARAGRAPH, other, "  " + PARAGRAPH.replace(",", "") + "  "]
+
+    kept, skipped = drop_near_duplicates(chunks)
+
+    assert kept == [PARAGRAPH, other]
+    assert skipped == 1
@@ -0,0 +1,65 @@
+import numpy as np
+
+from app.utils.extractive import (
+    split_sentences, select_sentences, prefilter_chunks, extractive_summary, textrank_scores, tfidf_matrix,
+    centroid_scores, to_dense,
+)
+
+ON_TOPIC = [
+    "The quarterly revenue grew because the new product sold well in every region.",
+    "Revenue from the new product exceeded the forecast in the northern region.",
+    "The board expects product revenue to keep growing next quarter.",
+    "Regional revenue targets were raised after the product launch.",
+]
+OFF_TOPIC = "The office kitchen will be repainted in a pleasant shade of green."
+
+
+def test_split_sentences_drops_fragments():
+    text = "Page 3.\n\nThe audit found no   issues in the ledger. Short one. The review is complete now."
+    assert split_sentences(text) == [
+        "The audit found no issues in the ledger.",
+        "The review is complete now.",
+    ]
+
+
+def test_select_sentences_keeps_central_sentences_in_order():
+    sentences = ON_TOPIC[:2] + [OFF_TOPIC] + ON_TOPIC[2:]
+    kept = select_sentences(sentences, keep_ratio=0.6)
+
+    assert len(kept) == 3
+    assert OFF_TOPIC not in kept
+    assert kept == [s for s in sentences if s in kept]  # Document order
+
+
+def test_select_sentences_respects_token_budget():
+    kept = select_sentences(ON_TOPIC, keep_ratio=1.0, token_budget=30)  # ~3 chars per token without a tokenizer
+    assert 1 <= len(kept) < len(ON_TOPIC)
+    assert sum(len(s) // 3 for s in kept) <= 30
+
+
+def test_select_sentences_empty():
+    assert select_sentences([], keep_ratio=0.5) == []
+
+
+def test_prefilter_chunks_scores_overlapping_sentences_once():
+    chunks = [" ".join(ON_TOPIC[:3]), " ".join(ON_TOPIC[2:])]  # ON_TOPIC[2] is in both (chunk overlap)
+    kept = prefilter_chunks(chunks, keep_ratio=1.0)
+    assert kept == ON_TOPIC
+
+
+def test_textrank_scores_sum_to_one():
+    scores = textrank_scores(tfidf_matrix(ON_TOPIC + [OFF_TOPIC]))
+    assert abs(float(scores.sum()) - 1.0) < 1e-3
+
+
+def test_sparse_centroid_scores_match_the_dense_computation():
+    m = tfidf_matrix(ON_TOPIC + [OFF_TOPIC, "Too short to score but still here ok."])
+    dense = to_dense(m)
+    assert np.allclose(np.linalg.norm(dense, axis=1), 1.0)
+
+    centroid = dense.mean(axis=0)
+    assert np.allclose(centroid_scores(m), dense @ (centroid / np.linalg.norm(centroid)), atol=1e-6)
+
+
+def test_extractive_summary_short_text_is_returned_whole():
+    assert extractive_summary(" ".join(ON_TOPIC[:2]), max_sentences=5) == " ".join(ON_TOPIC[:2])
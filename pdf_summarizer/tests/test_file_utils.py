@@ -0,0 +1,96 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI, File, UploadFile
+from starlette.requests import ClientDisconnect
+
+from app.utils.file_utils import BodyLimitMiddleware, SpooledStreamingResponse
+
+
+def _run(response, send):
+    scope = {"type": "http", "asgi": {"spec_version": "2.4"}}
+
+    async def receive():
+        return {"type": "http.disconnect"}
+
+    asyncio.run(response(scope, receive, send))
+
+
+def test_spooled_file_removed_when_client_is_gone_before_the_body(tmp_path):
+    path = tmp_path / "upload.pdf"
+    path.write_bytes(b"%PDF-1.4")
+    started = []
+
+    async def body():
+        started.append(True)
+        yield "never sent"
+
+    async def send(message):
+        raise OSError("client disconnected")
+
+    with pytest.raises(ClientDisconnect):
+        _run(SpooledStreamingResponse(body(), [str(path)]), send)
+
+    assert not started
+    assert not path.exists()
+
+
+def test_spooled_file_removed_after_a_normal_stream(tmp_path):
+    path = tmp_path / "upload.pdf"
+    path.write_bytes(b"%PDF-1.4")
+    sent = []
+
+    async def body():
+        yield "PROGRESS:1/1\n"
+
+    async def send(message):
+        sent.append(message)
+
+    _run(SpooledStreamingResponse(body(), [str(path)]), send)
+
+    assert any(m.get("body") == b"PROGRESS:1/1\n" for m in sent)
+    assert not path.exists()
+
+
+def _post(app, headers, blocks):
+    """ Sends a POST /upload with the body in 'blocks'; returns (status, number of blocks the app read). """
+    scope = {"type": "http", "asgi": {"spec_version": "2.4"}, "method": "POST", "path": "/upload",
+             "root_path": "", "query_string": b"", "headers": headers}
+    pending = list(blocks)
+    sent = []
+
+    async def receive():
+        block = pending.pop(0)
+        return {"type": "http.request", "body": block, "more_body": bool(pending)}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    return sent[0]["status"], len(blocks) - len(pending)
+
+
+def _limited_app():
+    app = FastAPI()
+    app.add_middleware(BodyLimitMiddleware, limits={"/upload": 0})  # Only the form overhead is allowed
+
+    @app.post("/upload")
+    async def upload(file: UploadFile = File(...)):
+        return {"size": len(await file.read())}
+
+    return app
+
+
+def test_declared_oversize_upload_is_rejected_before_the_body_is_read():
+    headers = [(b"content-type", b"multipart/form-data; boundary=x"), (b"content-length", b"5000000")]
+    assert _post(_limited_app(), headers, [b"x" * 1000]) == (413, 0)
+
+
+def test_chunked_oversize_upload_is_cut_off_while_streaming():
+    block = b"a" * (256 * 1024)
+    body = [b'--x\r\nContent-Disposition: form-data; name="file"; filename="a.pdf"\r\n\r\n'] + [block] * 8
+
+    status, read = _post(_limited_app(), [(b"content-type", b"multipart/form-data; boundary=x")], body)
+
+    assert status == 413
+    assert read < len(body)  # Stopped at the limit, the rest never left the socket
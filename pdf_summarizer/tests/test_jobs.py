@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+
+from app.services import jobs
+
+
+@pytest.fixture
+def queue(monkeypatch, tmp_path):
+    """ A small queue with no workers attached, so submitted jobs stay queued. """
+    monkeypatch.setattr(jobs, "_jobs", {})
+    monkeypatch.setattr(jobs, "_inflight", {})
+    monkeypatch.setattr(jobs, "_workers", ["idle"])
+    monkeypatch.setattr(jobs, "JOB_QUEUE_LIMIT", 2)
+    monkeypatch.setattr(jobs, "_queue", asyncio.Queue(maxsize=2))
+    return tmp_path
+
+
+def _spooled(folder, name):
+    path = folder / name
+    path.write_bytes(b"%PDF-1.4")
+    return str(path)
+
+
+def test_identical_uploads_share_one_job(queue):
+    first = jobs.submit_job(_spooled(queue, "a.pdf"), "hash", "t5-small")
+    second_path = _spooled(queue, "b.pdf")
+    second = jobs.submit_job(second_path, "hash", "t5-small")
+
+    assert second is first
+    assert jobs._queue.qsize() == 1
+    assert not (queue / "b.pdf").exists()  # The duplicate upload is deleted right away
+
+
+def test_different_settings_get_their_own_job(queue):
+    first = jobs.submit_job(_spooled(queue, "a.pdf"), "hash", "t5-small")
+    second = jobs.submit_job(_spooled(queue, "b.pdf"), "hash", "t5-small", prefilter=True)
+
+    assert second is not first
+    assert jobs._queue.qsize() == 2
+
+
+def test_full_queue_raises_and_removes_the_file(queue):
+    jobs.submit_job(_spooled(queue, "a.pdf"), "h1", "t5-small")
+    jobs.submit_job(_spooled(queue, "b.pdf"), "h2", "t5-small")
+
+    with pytest.raises(jobs.QueueFullError):
+        jobs.submit_job(_spooled(queue, "c.pdf"), "h3", "t5-small")
+    assert not (queue / "c.pdf").exists()
+
+
+def test_forget_old_jobs_keeps_history_bounded(queue, monkeypatch):
+    monkeypatch.setattr(jobs, "JOB_HISTORY_LIMIT", 1)
+    for i in range(3):
+        job = jobs.Job(f"k{i}", "t5-small")
+        job.status, job.finished_at = "done", float(i)
+        jobs._jobs[job.id] = job
+
+    jobs._forget_old_jobs()
+
+    assert [j.key for j in jobs._jobs.values()] == ["k2"]
@@ -0,0 +1,48 @@
+import fitz
+
+from app.utils.layout import extract_sections
+
+BODY = "The parties agree to the terms set out below and confirm them in writing. " * 4
+
+
+def _doc():
+    doc = fitz.open()
+    page = doc.new_page()
+    y = 60
+
+    def heading(text, size):
+        nonlocal y
+        page.insert_text((72, y), text, fontsize=size)
+        y += size + 10
+
+    def paragraph():
+        nonlocal y
+        box = fitz.Rect(72, y, 540, y + 80)
+        y += box.height - page.insert_textbox(box, BODY, fontsize=9) + 12
+
+    heading("1 Scope", 14)
+    heading("1.1 Purpose", 12)
+    paragraph()
+    # Two headings in a row: an empty section, not one wrapped title
+    heading("1.2 Definitions", 12)
+    heading("1.3 Obligations", 12)
+    paragraph()
+
+    # A title too long for its box wraps onto a second line of the same block
+    box = fitz.Rect(72, y, 260, y + 40)
+    page.insert_textbox(box, "1.4 Termination of the agreement by either party", fontsize=12)
+    y += 40
+    paragraph()
+    return doc
+
+
+def test_consecutive_headings_stay_separate_and_wrapped_titles_merge():
+    sections = extract_sections(_doc())
+    titles = [title for title, _ in sections]
+
+    assert titles == [
+        "1 Scope > 1.1 Purpose",
+        "1 Scope > 1.3 Obligations",
+        "1 Scope > 1.4 Termination of the agreement by either party",
+    ]
+    assert all(text.startswith("The parties agree") for _, text in sections)
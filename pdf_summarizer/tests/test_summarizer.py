@@ -0,0 +1,67 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.services import summarizer
+
+
+@pytest.fixture
+def fake_api(monkeypatch):
+    """ The API backend without a PDF or a network: the reduce sends its pieces from a worker thread. """
+    state = {"release": threading.Event(), "cancelled": False}
+
+    async def extraction(extract, pdf_source):
+        return "Some text."
+
+    async def summarize_api(chunks, trace=None):
+        for idx, chunk in enumerate(chunks, start=1):
+            yield idx, chunk
+
+    async def finalize_api(combined_summaries, on_partial=None):
+        def generate():
+            on_partial("First line\n")
+            on_partial("second line")
+            state["release"].wait(5)
+            return "First line\nsecond line"
+
+        try:
+            return await asyncio.to_thread(generate)
+        except asyncio.CancelledError:
+            state["cancelled"] = True
+            raise
+
+    monkeypatch.setattr(summarizer, "run_extraction", extraction)
+    monkeypatch.setattr(summarizer, "get_model_and_tokenizer", lambda name: (None, None))
+    monkeypatch.setattr(summarizer, "prepare_chunks", lambda *args: (["chunk one", "chunk two"], 0, 4))
+    monkeypatch.setattr(summarizer, "summarize_api", summarize_api)
+    monkeypatch.setattr(summarizer, "finalize_api", finalize_api)
+    yield state
+    state["release"].set()
+
+
+def test_partials_from_the_worker_thread_are_relayed_in_order(fake_api):
+    fake_api["release"].set()
+
+    async def collect():
+        return [msg async for msg in summarizer.summarize_text("doc.pdf", "api", partials=True)]
+    messages = asyncio.run(collect())
+
+    assert messages[-3:] == ["PARTIAL:First line\\n", "PARTIAL:second line", "SUMMARY:First line\\nsecond line"]
+
+
+def test_disconnect_mid_reduce_cancels_the_reduce(fake_api):
+    async def disconnect_after_first_piece():
+        stream = summarizer.summarize_text("doc.pdf", "api", partials=True)
+        async for msg in stream:
+            if msg.startswith("PARTIAL:"):
+                break
+        await stream.aclose()
+        await asyncio.sleep(0)  # Let the cancellation reach the reduce task
+        fake_api["release"].set()
+
+        # Neither the reduce task nor the queue read is left pending
+        return [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+
+    assert asyncio.run(disconnect_after_first_piece()) == []
+    assert fake_api["cancelled"]
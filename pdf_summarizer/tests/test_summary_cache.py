@@ -0,0 +1,115 @@
+import asyncio
+
+import pytest
+
+from app.services import summary_cache as cache
+
+PARAMS = {"num_beams": 4, "max_length": 300}
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch, tmp_path):
+    monkeypatch.setattr(cache, "SUMMARY_CACHE_ENABLED", True)
+    monkeypatch.setattr(cache, "SUMMARY_CACHE_PATH", str(tmp_path / "summaries.sqlite3"))
+    monkeypatch.setattr(cache, "SUMMARY_CACHE_MAX_ENTRIES", 3)
+    monkeypatch.setattr(cache, "_conn", None)
+    monkeypatch.setattr(cache, "_entries", 0)
+    monkeypatch.setattr(cache, "_touched", {})
+    monkeypatch.setattr(cache, "_stats", {"hits": 0, "misses": 0})
+    yield
+    if cache._conn is not None:
+        cache._conn.close()
+
+
+def test_key_ignores_whitespace_but_not_model_or_params():
+    key = cache.make_key("The  contract\nwas renewed.", "t5-small", PARAMS)
+
+    assert key == cache.make_key("The contract was renewed.", "t5-small", PARAMS)
+    assert key != cache.make_key("The contract was renewed.", "bart-large-cnn", PARAMS)
+    assert key != cache.make_key("The contract was renewed.", "t5-small", {**PARAMS, "num_beams": 2})
+
+
+def test_round_trip_and_stats():
+    assert cache.get_summary("chunk", "t5-small", PARAMS) is None
+    cache.put_summary("chunk", "t5-small", PARAMS, "summary")
+
+    assert cache.get_summary("chunk", "t5-small", PARAMS) == "summary"
+    assert cache.cache_stats() == {"hits": 1, "misses": 1, "hit_rate": 0.5, "entries": 1}
+
+
+def test_replacing_a_row_does_not_grow_the_count():
+    cache.put_summary("chunk", "t5-small", PARAMS, "first")
+    cache.put_summary("chunk", "t5-small", PARAMS, "second")
+
+    assert cache.cache_stats()["entries"] == 1
+    assert cache.get_summary("chunk", "t5-small", PARAMS) == "second"
+
+
+def test_eviction_drops_least_recently_used(monkeypatch):
+    clock = iter(range(100))
+    monkeypatch.setattr(cache.time, "time", lambda: float(next(clock)))
+
+    for name in ("a", "b", "c"):
+        cache.put_summary(name, "t5-small", PARAMS, name.upper())
+    cache.get_summary("a", "t5-small", PARAMS)   # "a" is now more recent than "b" (touch still pending)
+    cache.put_summary("d", "t5-small", PARAMS, "D")
+
+    assert cache.get_summary("b", "t5-small", PARAMS) is None
+    assert [cache.get_summary(n, "t5-small", PARAMS) for n in "acd"] == ["A", "C", "D"]
+    assert cache.cache_stats()["entries"] == 3
+
+
+def test_hits_are_counted_per_request():
+    cache.put_summary("shared", "t5-small", PARAMS, "S")
+
+    async def request(lookups):
+        counts = cache.track_request()
+        for chunk in lookups:
+            await asyncio.to_thread(cache.get_summary, chunk, "t5-small", PARAMS)
+            await asyncio.sleep(0)
+        return counts
+
+    async def main():
+        return await asyncio.gather(request(["shared", "new1"]), request(["shared", "shared", "new2", "new3"]))
+
+    first, second = asyncio.run(main())
+    assert first == {"hits": 1, "misses": 1}
+    assert second == {"hits": 2, "misses": 2}
+
+
+def test_disabled_cache_is_a_no_op(monkeypatch):
+    monkeypatch.setattr(cache, "SUMMARY_CACHE_ENABLED", False)
+    cache.put_summary("chunk", "t5-small", PARAMS, "summary")
+    assert cache.get_summary("chunk", "t5-small", PARAMS) is None
+
+
+class _FakeMistral:
+    """ Words as tokens; every generation is an endless run of one word. """
+
+    def __init__(self, word):
+        self.word = word
+
+    def tokenize(self, text, add_bos_token=True):
+        return text.split()
+
+    def detokenize(self, tokens):
+        return " ".join(tokens)
+
+    def generate(self, tokens, **sampling):
+        while True:
+            yield self.word
+
+
+def test_mistral_hits_stay_within_the_current_token_limit():
+    from app.services.summarizers import summarize_mistral
+
+    def first_summary(word, chunk_count):
+        chunks = [f"Chunk number {i} has plenty of text to be summarized." for i in range(chunk_count)]
+
+        async def run():
+            return [s async for _, s in summarize_mistral(_FakeMistral(word), chunks)][0]
+        return asyncio.run(run()).split()
+
+    assert first_summary("long", 3) == ["long"] * 350      # 3500 // 3 capped at 350, stored
+    assert first_summary("fresh", 12) == ["long"] * 291    # Same 512 bucket: a hit, cut to this run's limit
+    assert first_summary("fresh", 30) == ["fresh"] * 116   # 128 bucket: regenerated, not a 350-token summary
@@ -0,0 +1,94 @@
+import random
+
+from app.utils.text_utils import chunk_text, chunk_sections, count_tokens
+
+_WORDS = "revenue margin quarter growth customer contract supplier risk audit compliance forecast budget".split()
+
+
+def _sentences(n, seed=0):
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(_WORDS) for _ in range(rng.randint(8, 20))).capitalize() + "." for _ in range(n)]
+
+
+def test_chunks_respect_the_budget_and_keep_every_sentence():
+    sentences = _sentences(300)
+    chunks = chunk_text(" ".join(sentences), max_tokens=256, overlap_tokens=0)
+
+    assert all(count_tokens(c) <= 256 for c in chunks)
+    assert " ".join(chunks) == " ".join(sentences)
+
+
+def test_text_without_blank_lines_is_cut_between_sentences():
+    chunks = chunk_text(" ".join(_sentences(200)), max_tokens=350, overlap_tokens=50)
+    assert all(c.endswith(".") for c in chunks)
+
+
+def test_one_edit_only_changes_nearby_chunks():
+    # Content-defined boundaries: chunks after the edit line up with the old ones again
+    sentences = _sentences(2000)
+    edited = sentences[:100] + ["An inserted sentence about something else entirely."] + sentences[100:]
+
+    for max_tokens, overlap in ((350, 50), (800, 100), (256, 32), (2000, 0)):
+        before = chunk_text(" ".join(sentences), max_tokens=max_tokens, overlap_tokens=overlap)
+        after = chunk_text(" ".join(edited), max_tokens=max_tokens, overlap_tokens=overlap)
+        reused = len(set(before) & set(after))
+        assert reused >= len(after) - 3, (max_tokens, reused, len(after))
+
+
+def test_without_content_defined_cuts_chunks_fill_the_budget():
+    text = " ".join(_sentences(2000))
+    plain = chunk_text(text, max_tokens=350, overlap_tokens=0, content_defined=False)
+
+    assert len(plain) < len(chunk_text(text, max_tokens=350, overlap_tokens=0))
+    assert all(count_tokens(c) > 350 * 0.8 for c in plain[:-1])  # Short of the budget by at most one sentence
+
+
+def test_giant_sentence_is_sliced_in_document_order():
+    text = "Intro sentence here. " + "word " * 1000 + "\n\nClosing paragraph text."
+    chunks = chunk_text(text, max_tokens=100, overlap_tokens=0)
+
+    assert chunks[0] == "Intro sentence here."
+    assert chunks[-1].endswith("Closing paragraph text.")
+
+
+def _sections(n, seed=0):
+    rng = random.Random(seed)
+    return [(f"{i + 1} Part > {i + 1}.1 Details", " ".join(_sentences(rng.randint(2, 30), seed=seed + i))) for i in range(n)]
+
+
+def test_sections_respect_the_budget_including_titles():
+    for max_tokens in (256, 350, 800):
+        chunks, titles, counts = chunk_sections(_sections(40), max_tokens=max_tokens, with_counts=True)
+
+        assert all(count_tokens(c) <= max_tokens for c in chunks)
+        assert len(counts) == len(chunks) == len(titles)
+
+
+def test_every_chunk_starts_with_its_title_path():
+    sections = _sections(40)
+    chunks, titles = chunk_sections(sections, max_tokens=256)
+
+    for chunk, chunk_titles in zip(chunks, titles):
+        assert chunk.startswith(chunk_titles[0] + ": ")
+        assert all(f"{t}: " in chunk for t in chunk_titles)
+
+    # Nothing is lost: every sentence of every section lands in some chunk
+    text = " ".join(chunks)
+    assert all(s in text for _, body in sections for s in body.split(". "))
+
+
+def test_short_sections_share_a_chunk_and_untitled_text_has_no_title():
+    sections = [("", "Preamble sentence one. Preamble two."), ("1 Intro", "Short intro."), ("2 Scope", "Short scope.")]
+    chunks, titles = chunk_sections(sections, max_tokens=256)
+
+    assert chunks == ["Preamble sentence one. Preamble two. 1 Intro: Short intro. 2 Scope: Short scope."]
+    assert titles == [["1 Intro", "2 Scope"]]
+
+
+def test_long_section_is_cut_between_sentences():
+    sentences = _sentences(60)
+    chunks, titles = chunk_sections([("3 Results", " ".join(sentences))], max_tokens=200)
+
+    assert len(chunks) > 1
+    assert all(t == ["3 Results"] for t in titles)
+    assert all(c.endswith(".") for c in chunks)